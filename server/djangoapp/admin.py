@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Car, CarMake, Comment, CommentLike, Favorite
+from .models import Car, CarMake, CarViewCount, Comment, CommentLike, DealerReviewSummary, Favorite, RelatedCars
 
 
 class CarInline(admin.TabularInline):
@@ -45,4 +45,23 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(CommentLike)
 class CommentLikeAdmin(admin.ModelAdmin):
     list_display = ("user", "comment", "created_at")
-    search_fields = ("user__username", "comment__content")
\ No newline at end of file
+    search_fields = ("user__username", "comment__content")
+
+
+@admin.register(DealerReviewSummary)
+class DealerReviewSummaryAdmin(admin.ModelAdmin):
+    list_display = ("dealer_id", "total", "positive", "neutral", "negative", "purchases", "updated_at")
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(RelatedCars)
+class RelatedCarsAdmin(admin.ModelAdmin):
+    list_display = ("car", "stale_since", "updated_at")
+    readonly_fields = ("neighbors", "stale_since", "updated_at")
+
+
+@admin.register(CarViewCount)
+class CarViewCountAdmin(admin.ModelAdmin):
+    list_display = ("car", "views", "updated_at")
+    ordering = ("-views",)
+    readonly_fields = ("car", "views", "updated_at")
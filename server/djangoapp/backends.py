@@ -0,0 +1,30 @@
+"""Authentication backends for the djangoapp application."""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+# Columns needed to restore a session user and serialize it with
+# ``views._user_payload``; ``password`` is needed for the session hash check.
+SESSION_USER_FIELDS = (
+    "id",
+    "password",
+    "username",
+    "first_name",
+    "last_name",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+class SessionUserModelBackend(ModelBackend):
+    """``ModelBackend`` that loads the per-request session user with ``only()``."""
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.only(*SESSION_USER_FIELDS).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,575 @@
+"""Repeatable API benchmarks for the djangoapp views.
+
+The helpers here seed a synthetic dataset, replay a fixed set of API
+scenarios either through Django's test client or through a local WSGI server,
+and summarise latency, throughput and query counts.  They are driven by the
+``benchmark_api`` management command, which runs everything against a
+throw-away test database.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, List, Optional, Tuple
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+
+from .instrumentation import percentile
+from .models import Car, CarMake, Comment, CommentLike, Favorite
+
+BENCHMARK_PASSWORD = "benchmark-password"
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+SERVER_TIMING_UPSTREAM = re.compile(r'upstream;[^,]*desc="(\d+) calls"')
+
+
+@dataclass
+class Scale:
+    """Size of the synthetic dataset."""
+
+    makes: int = 10
+    cars_per_make: int = 10
+    users: int = 50
+    favorites_per_user: int = 10
+    comments_per_car: int = 10
+    reply_depth: int = 2
+    likes_per_comment: int = 3
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(makes=5, cars_per_make=5, users=20, favorites_per_user=5, comments_per_car=5),
+    "medium": Scale(),
+    "large": Scale(
+        makes=40,
+        cars_per_make=25,
+        users=500,
+        favorites_per_user=40,
+        comments_per_car=30,
+        reply_depth=3,
+        likes_per_comment=10,
+    ),
+}
+
+
+@dataclass
+class Dataset:
+    """Identifiers of the seeded rows that scenarios refer to."""
+
+    user_id: int
+    username: str
+    car_id: int
+    busy_car_id: int
+    comment_id: int
+    brand: str
+
+
+def seed_dataset(scale: Scale, seed: int = 0) -> Dataset:
+    """Insert a synthetic catalogue with users, favourites, comments and likes."""
+
+    rng = random.Random(seed)
+    User = get_user_model()
+    car_types = [code for code, _ in Car.CAR_TYPES]
+
+    makes = CarMake.objects.bulk_create(
+        [CarMake(name=f"Bench Make {index:03d}") for index in range(scale.makes)]
+    )
+    cars = Car.objects.bulk_create(
+        [
+            Car(
+                make=make,
+                name=f"Model {index:03d}",
+                car_type=rng.choice(car_types),
+                year=rng.randint(1995, 2025),
+                price=Decimal(rng.randrange(20_000, 3_000_000, 500)),
+                description="Synthetic benchmark car.",
+            )
+            for make in makes
+            for index in range(scale.cars_per_make)
+        ]
+    )
+
+    password = make_password(BENCHMARK_PASSWORD)
+    users = User.objects.bulk_create(
+        [User(username=f"bench-user-{index:05d}", password=password) for index in range(scale.users)]
+    )
+
+    favorites = []
+    for user in users:
+        for car in rng.sample(cars, min(scale.favorites_per_user, len(cars))):
+            favorites.append(Favorite(user=user, car=car))
+    Favorite.objects.bulk_create(favorites, batch_size=1000)
+
+    # The most commented car gets a deeper thread so comment views have work to do.
+    busy_car = cars[0]
+    comments: List[Comment] = []
+    level = Comment.objects.bulk_create(
+        [
+            Comment(car=car, user=rng.choice(users), content=f"Comment {index} on {car.name}")
+            for car in cars
+            for index in range(scale.comments_per_car * (5 if car is busy_car else 1))
+        ],
+        batch_size=1000,
+    )
+    comments.extend(level)
+    for depth in range(scale.reply_depth):
+        parents = [comment for comment in level if rng.random() < 0.5]
+        level = Comment.objects.bulk_create(
+            [
+                Comment(
+                    car_id=parent.car_id,
+                    user=rng.choice(users),
+                    parent=parent,
+                    content=f"Reply level {depth + 1}",
+                )
+                for parent in parents
+            ],
+            batch_size=1000,
+        )
+        comments.extend(level)
+
+    likes = []
+    for comment in comments:
+        for user in rng.sample(users, min(scale.likes_per_comment, len(users))):
+            likes.append(CommentLike(user=user, comment=comment))
+    CommentLike.objects.bulk_create(likes, batch_size=1000)
+
+    return Dataset(
+        user_id=users[0].id,
+        username=users[0].username,
+        car_id=cars[-1].id,
+        busy_car_id=busy_car.id,
+        comment_id=comments[0].id,
+        brand=makes[0].name,
+    )
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    authenticated: bool = False
+
+
+def build_scenarios(dataset: Dataset) -> List[Scenario]:
+    """The request mix covered by every benchmark run."""
+
+    cars = "/djangoapp/api/cars/"
+    return [
+        Scenario("api_cars", "GET", cars),
+        Scenario("api_cars[authenticated]", "GET", cars, authenticated=True),
+        Scenario("api_cars[search]", "GET", f"{cars}?search=Model+00"),
+        Scenario("api_cars[brand]", "GET", f"{cars}?brand={dataset.brand.replace(' ', '+')}"),
+        Scenario("api_cars[price]", "GET", f"{cars}?price_min=100000&price_max=900000"),
+        Scenario("api_cars[year]", "GET", f"{cars}?year_min=2005&year_max=2020"),
+        Scenario(
+            "api_cars[combined]",
+            "GET",
+            f"{cars}?search=Model&price_min=50000&price_max=2000000&year_min=2000&year_max=2024",
+        ),
+        Scenario("api_car_detail", "GET", f"{cars}{dataset.car_id}/"),
+        Scenario("api_car_detail[authenticated]", "GET", f"{cars}{dataset.car_id}/", authenticated=True),
+        Scenario("api_car_comments", "GET", f"{cars}{dataset.busy_car_id}/comments/"),
+        Scenario(
+            "api_car_comments[authenticated]",
+            "GET",
+            f"{cars}{dataset.busy_car_id}/comments/",
+            authenticated=True,
+        ),
+        Scenario("api_toggle_favorite", "POST", f"{cars}{dataset.car_id}/favorite/", authenticated=True),
+        Scenario(
+            "api_toggle_comment_like",
+            "POST",
+            f"/djangoapp/api/comments/{dataset.comment_id}/like/",
+            authenticated=True,
+        ),
+        Scenario("api_user_profile", "GET", "/djangoapp/api/user/profile/", authenticated=True),
+    ]
+
+
+def _count_from_header(pattern: "re.Pattern[str]", value: Optional[str]) -> Optional[int]:
+    match = pattern.search(value or "")
+    return int(match.group(1)) if match else None
+
+
+@dataclass
+class Measurement:
+    latencies: List[float]
+    queries: List[int]
+    upstream_calls: List[int]
+    errors: int
+    elapsed: float
+
+
+def summarise(name: str, mode: str, measurement: Measurement) -> Dict:
+    ordered = sorted(measurement.latencies)
+    query_counts = sorted(measurement.queries)
+    upstream_calls = sorted(measurement.upstream_calls)
+    elapsed = measurement.elapsed
+    return {
+        "scenario": name,
+        "mode": mode,
+        "requests": len(ordered),
+        "errors": measurement.errors,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p50": round(percentile(ordered, 50), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "p99": round(percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3),
+        },
+        "queries": {
+            "p50": percentile(query_counts, 50) if query_counts else None,
+            "max": query_counts[-1] if query_counts else None,
+        },
+        "upstream_calls": {
+            "p50": percentile(upstream_calls, 50) if upstream_calls else None,
+            "max": upstream_calls[-1] if upstream_calls else None,
+        },
+    }
+
+
+def _measure(send: Callable[[], Tuple[int, Optional[str]]], iterations: int, warmup: int) -> Measurement:
+    """Call ``send`` repeatedly; it returns the status code and ``Server-Timing`` header."""
+
+    for _ in range(warmup):
+        send()
+    measurement = Measurement([], [], [], 0, 0.0)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request_started = time.perf_counter()
+        status, header = send()
+        measurement.latencies.append((time.perf_counter() - request_started) * 1000)
+        if status >= 400:
+            measurement.errors += 1
+        queries = _count_from_header(SERVER_TIMING_QUERIES, header)
+        if queries is not None:
+            measurement.queries.append(queries)
+        calls = _count_from_header(SERVER_TIMING_UPSTREAM, header)
+        if calls is not None:
+            measurement.upstream_calls.append(calls)
+    measurement.elapsed = time.perf_counter() - started
+    return measurement
+
+
+def run_client(scenarios: List[Scenario], dataset: Dataset, iterations: int, warmup: int) -> List[Dict]:
+    """Replay the scenarios in-process through ``django.test.Client``."""
+
+    user = get_user_model().objects.get(pk=dataset.user_id)
+    anonymous = Client()
+    authenticated = Client()
+    authenticated.force_login(user)
+
+    results = []
+    for scenario in scenarios:
+        client = authenticated if scenario.authenticated else anonymous
+        call = client.post if scenario.method == "POST" else client.get
+
+        def send(call=call, path=scenario.path):
+            response = call(path)
+            return response.status_code, response.get("Server-Timing")
+
+        results.append(summarise(scenario.name, "client", _measure(send, iterations, warmup)))
+    return results
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        pass
+
+
+def run_wsgi(scenarios: List[Scenario], dataset: Dataset, iterations: int, warmup: int) -> List[Dict]:
+    """Replay the scenarios over HTTP against a local threaded WSGI server."""
+
+    import requests
+    from django.core.handlers.wsgi import WSGIHandler
+
+    server = make_server(
+        "127.0.0.1",
+        0,
+        WSGIHandler(),
+        server_class=_ThreadingWSGIServer,
+        handler_class=_QuietHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    login = Client()
+    login.force_login(get_user_model().objects.get(pk=dataset.user_id))
+    session_cookie = login.cookies[settings.SESSION_COOKIE_NAME].value
+
+    anonymous = requests.Session()
+    authenticated = requests.Session()
+    authenticated.cookies.set(settings.SESSION_COOKIE_NAME, session_cookie)
+
+    results = []
+    try:
+        for scenario in scenarios:
+            session = authenticated if scenario.authenticated else anonymous
+
+            def send(session=session, scenario=scenario):
+                response = session.request(scenario.method, base_url + scenario.path)
+                return response.status_code, response.headers.get("Server-Timing")
+
+            results.append(summarise(scenario.name, "wsgi", _measure(send, iterations, warmup)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def dealer_scenarios(dealerships: List[dict], reviews: List[dict]) -> List[Scenario]:
+    """Requests against the dealer views, which only talk to the upstreams."""
+
+    busiest = Counter(review["dealership"] for review in reviews).most_common(1)[0][0]
+    state = Counter(dealer["state"] for dealer in dealerships).most_common(1)[0][0]
+    return [
+        Scenario("get_dealers", "GET", "/djangoapp/get_dealers"),
+        Scenario("get_dealers_by_state", "GET", f"/djangoapp/get_dealers/{state}"),
+        Scenario("dealer_details", "GET", f"/djangoapp/dealer/{busiest}"),
+        Scenario("dealer_reviews", "GET", f"/djangoapp/reviews/dealer/{busiest}"),
+    ]
+
+
+def _payload_failed(payload: Dict) -> bool:
+    """Whether a legacy dealer view wrapped an upstream failure in a 200 response."""
+
+    if payload.get("status", 200) >= 400:
+        return True
+    return any(value is None or (isinstance(value, dict) and "error" in value) for value in payload.values())
+
+
+def run_dealer_matrix(
+    latencies_ms: List[float],
+    error_rates: List[float],
+    iterations: int,
+    warmup: int,
+    seed: int = 0,
+) -> List[Dict]:
+    """Replay the dealer scenarios against fake upstreams of varying health.
+
+    ``restapis`` is pointed at :mod:`djangoapp.upstream_fakes` for the run and
+    restored afterwards.  Each result row carries the injected latency and
+    error rate so the degradation curve can be read straight from the report.
+    """
+
+    from . import restapis, upstream_fakes
+
+    dealerships, reviews = upstream_fakes.load_seed_data()
+    scenarios = dealer_scenarios(dealerships, reviews)
+    client = Client(raise_request_exception=False)
+    original = (restapis.backend_url, restapis.sentiment_analyzer_url)
+
+    results = []
+    try:
+        for latency in latencies_ms:
+            for error_rate in error_rates:
+                options = {"latency_ms": latency, "error_rate": error_rate, "seed": seed}
+                with upstream_fakes.dealer_backend(**options) as backend, \
+                        upstream_fakes.sentiment_analyzer(**options) as analyzer:
+                    restapis.backend_url = backend.url
+                    restapis.sentiment_analyzer_url = analyzer.url + "/"
+                    for scenario in scenarios:
+
+                        def send(path=scenario.path):
+                            response = client.get(path)
+                            status = response.status_code
+                            if status < 400 and _payload_failed(response.json()):
+                                status = 502
+                            return status, response.get("Server-Timing")
+
+                        row = summarise(scenario.name, "client", _measure(send, iterations, warmup))
+                        row["upstream_latency_ms"] = latency
+                        row["upstream_error_rate"] = error_rate
+                        results.append(row)
+    finally:
+        restapis.backend_url, restapis.sentiment_analyzer_url = original
+    return results
+
+
+def run_write_concurrency(threads: int, operations: int, seed: int = 0) -> Dict:
+    """Replay favourite toggles, comment posts and like toggles from parallel threads.
+
+    Every thread uses its own seeded user and database connection, so the
+    result shows how the configured database copes with concurrent writers.
+    Requests that fail (e.g. "database is locked") are counted as errors.
+    """
+
+    users = list(get_user_model().objects.filter(username__startswith="bench-user-")[:threads])
+    if len(users) < threads:
+        raise ValueError(f"Need {threads} seeded users, found {len(users)}.")
+    car_ids = list(Car.objects.values_list("id", flat=True))
+    comment_ids = list(Comment.objects.values_list("id", flat=True)[:1000])
+
+    clients = []
+    for user in users:
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        clients.append(client)
+
+    barrier = threading.Barrier(threads)
+    measurements: List[Measurement] = []
+    lock = threading.Lock()
+
+    def worker(index: int, client: Client) -> None:
+        rng = random.Random(seed + index)
+        operations_left = operations
+
+        def send():
+            nonlocal operations_left
+            operations_left -= 1
+            kind = operations_left % 3
+            if kind == 0:
+                response = client.post(f"/djangoapp/api/cars/{rng.choice(car_ids)}/favorite/")
+            elif kind == 1:
+                response = client.post(
+                    f"/djangoapp/api/cars/{rng.choice(car_ids)}/comments/",
+                    json.dumps({"content": f"Concurrent comment {operations_left}"}),
+                    content_type="application/json",
+                )
+            else:
+                response = client.post(f"/djangoapp/api/comments/{rng.choice(comment_ids)}/like/")
+            return response.status_code, response.get("Server-Timing")
+
+        try:
+            barrier.wait()
+            result = _measure(send, operations, 0)
+            with lock:
+                measurements.append(result)
+        finally:
+            connections.close_all()
+
+    workers = [
+        threading.Thread(target=worker, args=(index, client)) for index, client in enumerate(clients)
+    ]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    combined = Measurement([], [], [], 0, elapsed)
+    for result in measurements:
+        combined.latencies += result.latencies
+        combined.queries += result.queries
+        combined.upstream_calls += result.upstream_calls
+        combined.errors += result.errors
+    row = summarise("concurrent_writes", "client", combined)
+    row["threads"] = threads
+    return row
+
+
+def compare(current: List[Dict], baseline: List[Dict]) -> List[Dict]:
+    """Relative p50/p95 latency and query changes against an earlier run."""
+
+    def key(row):
+        return (
+            row["scenario"],
+            row["mode"],
+            row.get("upstream_latency_ms"),
+            row.get("upstream_error_rate"),
+        )
+
+    previous = {key(row): row for row in baseline}
+    rows = []
+    for row in current:
+        before = previous.get(key(row))
+        if not before:
+            continue
+        rows.append(
+            {
+                "scenario": row["scenario"],
+                "mode": row["mode"],
+                "p50_change": _ratio(row["latency_ms"]["p50"], before["latency_ms"]["p50"]),
+                "p95_change": _ratio(row["latency_ms"]["p95"], before["latency_ms"]["p95"]),
+                "queries_before": before["queries"]["max"],
+                "queries_after": row["queries"]["max"],
+            }
+        )
+    return rows
+
+
+def _ratio(after: float, before: float) -> float:
+    if not before:
+        return 0.0
+    return round(after / before - 1, 4)
+
+
+def report_meta(**extra) -> Dict:
+    """Environment details stored next to the results."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": timezone.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        **extra,
+    }
+
+
+def format_row(row: Dict) -> str:
+    latency = row["latency_ms"]
+    label = row["scenario"]
+    if "upstream_latency_ms" in row:
+        label += f" @{row['upstream_latency_ms']:g}ms/{row['upstream_error_rate']:.0%}err"
+    return (
+        f"{row['mode']:6} {label:34} {row['throughput_rps']:>9} rps  "
+        f"p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  "
+        f"p99 {latency['p99']:>8} ms  queries {row['queries']['max']}  "
+        f"upstream {row['upstream_calls']['max']}  errors {row['errors']}"
+    )
+
+
+def format_comparison(row: Dict) -> str:
+    return (
+        f"{row['mode']:6} {row['scenario']:34} p50 {row['p50_change']:+.1%}  "
+        f"p95 {row['p95_change']:+.1%}  queries "
+        f"{row['queries_before']} -> {row['queries_after']}"
+    )
+
+
+def load_results(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+
+def write_report(path: str, meta: Dict, results: List[Dict]) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"meta": meta, "results": results}, handle, indent=2)
+
+
+def scale_as_dict(scale: Scale) -> Dict[str, int]:
+    return asdict(scale)
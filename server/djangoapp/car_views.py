@@ -0,0 +1,115 @@
+"""Per-car view counts, buffered in memory and written in bulk.
+
+``api_car_detail`` calls :func:`record`, which only increments a counter in
+a dict.  A daemon thread writes the buffered counts to :class:`CarViewCount`
+every ``CAR_VIEW_FLUSH_SECONDS``, or sooner once ``CAR_VIEW_FLUSH_EVENTS``
+views are pending, with one ``INSERT ... ON CONFLICT DO UPDATE`` adding them
+to the stored totals.  The buffer is flushed again when the interpreter
+exits (a graceful worker shutdown), and counts whose flush failed are put
+back for the next one.  A killed worker loses at most one interval.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import Car, CarViewCount
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert(counts: Dict[int, int]) -> None:
+    """Add ``counts`` to the stored view totals in one statement."""
+
+    using = router.db_for_write(CarViewCount)
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        # Views of cars deleted since are dropped instead of failing the batch.
+        existing = Car.objects.using(using).filter(pk__in=list(counts)).values_list("pk", flat=True)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = [(car_id, counts[car_id], now) for car_id in existing]
+        if not rows:
+            return
+        table = connection.ops.quote_name(CarViewCount._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (car_id, views, updated_at) VALUES (%s, %s, %s) "
+                f"ON CONFLICT (car_id) DO UPDATE SET views = {table}.views + excluded.views, "
+                "updated_at = excluded.updated_at",
+                rows,
+            )
+
+
+class ViewCounter:
+    """Process-wide buffer of car views, flushed by a background thread."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = defaultdict(int)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, car_id: int) -> None:
+        with self._lock:
+            self._counts[car_id] += 1
+            self._pending += 1
+            full = self._pending >= settings.CAR_VIEW_FLUSH_EVENTS
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="car-view-flush", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write the buffered views; returns how many were written."""
+
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts, self._pending = self._counts, defaultdict(int), 0
+            if not counts:
+                return 0
+            try:
+                _upsert(counts)
+            except Exception:
+                with self._lock:
+                    for car_id, views in counts.items():
+                        self._counts[car_id] += views
+                        self._pending += views
+                raise
+            return sum(counts.values())
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(settings.CAR_VIEW_FLUSH_SECONDS)
+            self._wake.clear()
+            started = time.monotonic()
+            try:
+                written = self.flush()
+                if written:
+                    logger.debug("Flushed %s car views in %.1f ms", written, (time.monotonic() - started) * 1000)
+            except Exception:
+                logger.exception("Flushing car views failed; they are kept for the next flush")
+                time.sleep(settings.CAR_VIEW_FLUSH_SECONDS)
+            finally:
+                connections.close_all()
+
+
+counter = ViewCounter()
+
+
+def record(car_id: int) -> None:
+    """Count one view of ``car_id`` (no database access)."""
+
+    counter.record(car_id)
@@ -0,0 +1,304 @@
+"""Optional in-memory read engine for the car catalogue.
+
+With ``CATALOGUE_ENGINE = "memory"`` the catalogue views read an immutable
+:class:`CatalogueSnapshot` held by each worker instead of querying the
+database.  The snapshot keeps the cars in listing order, with bitmap
+columns (see :mod:`djangoapp.inventory`) for make, type, year and price, so
+every ``api_cars`` filter is a bitmap and listing is a walk over set bits.
+
+The snapshot only holds what changes with catalogue edits.  Writes to cars
+and makes bump a catalogue version in the cache (:func:`bump_version`,
+wired in ``djangoapp.signals``); a worker that sees a new version builds a
+fresh snapshot and swaps it in atomically, and requests keep using the
+previous one until then.  Bulk ORM operations do not send signals, so code
+using them calls :func:`bump_version` itself.  Workers only see each other's
+bumps through a shared cache; ``CATALOGUE_SNAPSHOT_MAX_AGE`` bounds the
+staleness otherwise.
+
+Values that change with ordinary traffic (favourite and comment counts,
+trending scores) live in a :class:`CatalogueOverlay` instead, re-read with
+a few queries every ``CATALOGUE_OVERLAY_TTL`` seconds.  Favourite and
+comment writes in a worker also adjust its overlay counts in place, so they
+never invalidate the snapshot.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import threading
+import time
+from array import array
+from decimal import Decimal
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .inventory import CategoricalColumn, NumericColumn, bitmap_from_rows, iter_bits
+from .models import Car, Comment, Favorite
+
+VERSION_KEY = "catalogue:version"
+
+# Parsed api_cars filters: search/brand/type strings, price/year (low, high) bounds.
+Filters = Dict[str, object]
+
+T = TypeVar("T")
+
+
+def current_version(key: str = VERSION_KEY) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key: str = VERSION_KEY) -> None:
+    """Mark every value cached under the version ``key`` as out of date."""
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+class VersionedValue(Generic[T]):
+    """A per-worker value rebuilt when its version changes or it gets too old.
+
+    ``version_key`` names a version counter in the cache (``None`` for a value
+    that only expires).  While one request rebuilds the value, the others
+    keep getting the previous one instead of waiting.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], T],
+        max_age: Callable[[], float],
+        version_key: Optional[str] = None,
+    ) -> None:
+        self.build = build
+        self.max_age = max_age
+        self.version_key = version_key
+        self._entry: Optional[Tuple[T, Optional[int], float]] = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry, version: Optional[int]) -> bool:
+        return (
+            entry is not None
+            and entry[1] == version
+            and time.monotonic() - entry[2] < self.max_age()
+        )
+
+    def get(self) -> T:
+        entry = self._entry
+        version = current_version(self.version_key) if self.version_key else None
+        if self._fresh(entry, version):
+            return entry[0]
+        if entry is not None and not self._lock.acquire(blocking=False):
+            return entry[0]  # another request is rebuilding it
+        if entry is None:
+            self._lock.acquire()
+        try:
+            entry = self._entry
+            if not self._fresh(entry, version):
+                entry = self._entry = (self.build(), version, time.monotonic())
+            return entry[0]
+        finally:
+            self._lock.release()
+
+    def peek(self) -> Optional[T]:
+        """The current value, if one was built, without refreshing it."""
+
+        entry = self._entry
+        return None if entry is None else entry[0]
+
+    def invalidate(self) -> None:
+        self._entry = None
+
+
+def _cents(value: Decimal) -> int:
+    return int(value * 100)
+
+
+class CatalogueSnapshot:
+    """Immutable copy of the catalogue in listing order (make name, car name)."""
+
+    def __init__(self, cars: List[Car]) -> None:
+        self.cars = cars
+        self.rows: Dict[int, int] = {car.id: row for row, car in enumerate(cars)}
+        size = self.size = len(cars)
+        self.all = (1 << size) - 1
+        self.makes = CategoricalColumn([car.make.name.lower() for car in cars], size)
+        self.types = CategoricalColumn([car.car_type.lower() for car in cars], size)
+        self.years = CategoricalColumn([car.year for car in cars], size)
+        self.year_range = NumericColumn([car.year for car in cars], size, block=64)
+        self.price_range = NumericColumn([_cents(car.price) for car in cars], size, block=64)
+        self.search_text = [f"{car.name}\0{car.make.name}".lower() for car in cars]
+
+        self.brands = sorted({car.make.name for car in cars})
+        self.brand_keys = {name: name.lower() for name in self.brands}
+        self.year_values = sorted({car.year for car in cars}, reverse=True)
+        prices = [car.price for car in cars]
+        self.min_price = min(prices) if prices else None
+        self.max_price = max(prices) if prices else None
+
+    @classmethod
+    def build(cls) -> "CatalogueSnapshot":
+        return cls(list(Car.objects.select_related("make").order_by("make__name", "name")))
+
+    def get(self, car_id: int) -> Optional[Car]:
+        row = self.rows.get(car_id)
+        return None if row is None else self.cars[row]
+
+    def _price_bitmap(self, low: Optional[Decimal], high: Optional[Decimal]) -> int:
+        return self.price_range.between(
+            None if low is None else math.ceil(low * 100),
+            None if high is None else math.floor(high * 100),
+        )
+
+    def match(self, filters: Filters, skip: Optional[str] = None) -> int:
+        """Bitmap of the cars matching ``filters``, ignoring the ``skip`` filter."""
+
+        bitmap = self.all
+        for name, value in filters.items():
+            if name == skip:
+                continue
+            if name == "search":
+                needle = str(value).lower()
+                bitmap &= bitmap_from_rows(
+                    (row for row, text in enumerate(self.search_text) if needle in text), self.size
+                )
+            elif name == "brand":
+                bitmap &= self.makes.bitmap(str(value).strip().lower())
+            elif name == "type":
+                bitmap &= self.types.bitmap(str(value).strip().lower())
+            elif name == "year":
+                bitmap &= self.year_range.between(*value)
+            elif name == "price":
+                bitmap &= self._price_bitmap(*value)
+        return bitmap
+
+    def select(self, bitmap: int, rank: Optional[array] = None) -> List[Car]:
+        """The matching cars, in listing order or ordered by ``rank[row]``."""
+
+        rows = iter_bits(bitmap)
+        if rank is not None:
+            rows = sorted(rows, key=rank.__getitem__)
+        return [self.cars[row] for row in rows]
+
+    def brand_counts(self, bitmap: int) -> Dict[str, int]:
+        return {name: (self.makes.bitmap(key) & bitmap).bit_count() for name, key in self.brand_keys.items()}
+
+    def year_counts(self, bitmap: int) -> Dict[int, int]:
+        return self.years.counts(bitmap)
+
+    def type_counts(self, bitmap: int) -> Dict[str, int]:
+        return {str(label).upper(): count for label, count in self.types.counts(bitmap).items()}
+
+    def price_counts(self, bitmap: int, buckets: List[Tuple[Decimal, Decimal]]) -> List[int]:
+        counts = []
+        last = len(buckets) - 1
+        for index, (low, high) in enumerate(buckets):
+            upper = self._price_bitmap(low, high)
+            if index != last:
+                upper &= ~self._price_bitmap(high, high)
+            counts.append((upper & bitmap).bit_count())
+        return counts
+
+
+def _grouped_counts(model) -> Dict[int, int]:
+    return dict(model.objects.values_list("car_id").annotate(count=Count("id")).order_by())
+
+
+class CatalogueOverlay:
+    """Favourite/comment counts and trending scores of the cars, read together."""
+
+    def __init__(self) -> None:
+        self.favorites = _grouped_counts(Favorite)
+        self.comments = _grouped_counts(Comment)
+        self.trending: Dict[int, float] = dict(
+            Car.objects.filter(trending_score__isnull=False).values_list("id", "trending_score")
+        )
+        self._rank: Optional[Tuple[CatalogueSnapshot, array]] = None
+
+    def _counts(self, kind: str) -> Dict[int, int]:
+        return self.favorites if kind == "favorite" else self.comments
+
+    def adjust(self, kind: str, car_id: int, delta: int) -> None:
+        counts = self._counts(kind)
+        counts[car_id] = max(0, counts.get(car_id, 0) + delta)
+
+    def update(self, kind: str, counts: Dict[int, int]) -> None:
+        """Replace the ``kind`` counts of the cars in ``counts`` with fresh totals."""
+
+        self._counts(kind).update(counts)
+
+    def apply(self, cars: Iterable[Car]) -> List[Car]:
+        """Per-request copies of snapshot ``cars`` carrying the overlay values."""
+
+        result = []
+        for car in cars:
+            car = copy.copy(car)
+            car.favorite_count = self.favorites.get(car.id, 0)
+            car.comment_count = self.comments.get(car.id, 0)
+            car.trending_score = self.trending.get(car.id)
+            result.append(car)
+        return result
+
+    def trending_rank(self, snapshot: CatalogueSnapshot) -> array:
+        """Position of each snapshot row when ordered by trending score, highest first."""
+
+        cached = self._rank
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        scores = [self.trending.get(car.id) for car in snapshot.cars]
+        order = sorted(
+            range(snapshot.size),
+            key=lambda row: (scores[row] is None, -(scores[row] or 0.0), row),
+        )
+        rank = array("I", bytes(4 * len(order)))
+        for position, row in enumerate(order):
+            rank[row] = position
+        self._rank = (snapshot, rank)
+        return rank
+
+
+class CatalogueEngine:
+    """Per-worker holder of the current snapshot and overlay."""
+
+    def __init__(self) -> None:
+        self._snapshot = VersionedValue(
+            CatalogueSnapshot.build, lambda: settings.CATALOGUE_SNAPSHOT_MAX_AGE, VERSION_KEY
+        )
+        self._overlay = VersionedValue(CatalogueOverlay, lambda: settings.CATALOGUE_OVERLAY_TTL)
+
+    def snapshot(self) -> CatalogueSnapshot:
+        """The current snapshot, rebuilt first if the catalogue changed."""
+
+        return self._snapshot.get()
+
+    def overlay(self) -> CatalogueOverlay:
+        return self._overlay.get()
+
+    def adjust_count(self, kind: str, car_id: int, delta: int) -> None:
+        """Apply a committed favourite or comment change to this worker's overlay."""
+
+        overlay = self._overlay.peek()
+        if overlay is not None:
+            overlay.adjust(kind, car_id, delta)
+
+    def update_counts(self, kind: str, counts: Dict[int, int]) -> None:
+        """Store committed ``kind`` totals of some cars in this worker's overlay."""
+
+        overlay = self._overlay.peek()
+        if overlay is not None:
+            overlay.update(kind, counts)
+
+    def invalidate(self) -> None:
+        self._snapshot.invalidate()
+        self._overlay.invalidate()
+
+
+engine = CatalogueEngine()
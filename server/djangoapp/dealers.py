@@ -0,0 +1,141 @@
+"""In-process cache of the dealer directory.
+
+Dealerships are reference data that the Express backend loads once from
+``dealerships.json``, so the Django tier keeps its own copy indexed by id and
+state instead of proxying ``/fetchDealers`` on every request.  The copy is
+refreshed in a background thread once it is older than
+``settings.DEALER_DIRECTORY_TTL`` seconds; until a refresh succeeds the stale
+copy keeps being served (stale-while-revalidate), so a backend outage does
+not take the dealer pages down with it.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+
+from . import restapis
+from .geo import GridIndex
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_all_dealers() -> Optional[List[dict]]:
+    """Load the full dealer list from the backend, ``None`` on failure."""
+
+    dealers = restapis.get_request("/fetchDealers")
+    if not isinstance(dealers, list):
+        return None
+    return dealers
+
+
+class DirectorySnapshot:
+    """Immutable dealer list with its lookup indexes."""
+
+    __slots__ = ("dealers", "by_id", "by_state", "geo", "loaded_at")
+
+    def __init__(self, dealers: List[dict], loaded_at: float) -> None:
+        self.dealers = dealers
+        self.by_id: Dict[int, dict] = {}
+        self.by_state: Dict[str, List[dict]] = {}
+        for dealer in dealers:
+            try:
+                self.by_id[int(dealer["id"])] = dealer
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.by_state.setdefault(dealer.get("state"), []).append(dealer)
+        self.geo = GridIndex.from_dealers(self.by_id.values())
+        self.loaded_at = loaded_at
+
+
+class DealerDirectory:
+    """Dealer lookups served from memory with background TTL refreshes."""
+
+    def __init__(
+        self,
+        loader: Callable[[], Optional[List[dict]]] = fetch_all_dealers,
+        ttl: Optional[float] = None,
+        retry_after: float = 30.0,
+    ) -> None:
+        self.loader = loader
+        self._ttl = ttl
+        self.retry_after = retry_after
+        self._snapshot: Optional[DirectorySnapshot] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._next_attempt = 0.0
+        self.version = 0
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "DEALER_DIRECTORY_TTL", 300)
+
+    def snapshot(self) -> Optional[DirectorySnapshot]:
+        """Return the current snapshot, loading or refreshing it as needed.
+
+        The first call blocks on the backend; later calls never do.  ``None``
+        means no copy could be loaded yet.
+        """
+
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None and now >= self._next_attempt:
+                    self._load(now)
+                return self._snapshot
+        if now - snapshot.loaded_at >= self.ttl:
+            self._refresh_in_background(now)
+        return snapshot
+
+    def refresh(self) -> bool:
+        """Reload the directory synchronously; ``False`` if the backend failed."""
+
+        with self._lock:
+            return self._load(time.monotonic())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._next_attempt = 0.0
+
+    def _load(self, now: float) -> bool:
+        try:
+            dealers = self.loader()
+        except Exception:  # pragma: no cover - loader failures are logged and retried
+            logger.exception("Dealer directory refresh failed")
+            dealers = None
+        if dealers is None:
+            # Keep serving whatever we have and retry later, not on every request.
+            self._next_attempt = now + self.retry_after
+            logger.warning(
+                "Dealer directory unavailable, %s",
+                "serving stale copy" if self._snapshot else "no copy loaded yet",
+            )
+            return False
+        self._snapshot = DirectorySnapshot(dealers, time.monotonic())
+        self.version += 1
+        return True
+
+    def _refresh_in_background(self, now: float) -> None:
+        with self._lock:
+            if self._refreshing or now < self._next_attempt:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="dealer-directory-refresh", daemon=True).start()
+
+
+directory = DealerDirectory()
@@ -0,0 +1,157 @@
+"""Great-circle distances and a grid index for nearest-dealer lookups.
+
+Dealers are bucketed into cells of ``cell_deg`` degrees.  A query only
+computes distances for the cells around the query point, growing ring by
+ring until no unvisited cell can hold anything closer than what was found.
+The haversine terms that depend on a point alone (radians, cosine of the
+latitude) are computed once when the index is built.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Below this many points scanning them all beats walking the grid.
+LINEAR_SCAN_MAX = 256
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres between two coordinates."""
+
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def valid_coordinate(lat: float, lon: float) -> bool:
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+class GridIndex:
+    """Points bucketed on a lat/long grid; ``items[i]`` is returned for point ``i``."""
+
+    def __init__(self, points: Iterable[Tuple[float, float, object]], cell_deg: float = 2.0) -> None:
+        self.cell_deg = cell_deg
+        self.items: List[object] = []
+        self._lat = array("d")
+        self._lon = array("d")
+        self._cos_lat = array("d")
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for lat, lon, item in points:
+            index = len(self.items)
+            self.items.append(item)
+            self._lat.append(math.radians(lat))
+            self._lon.append(math.radians(lon))
+            self._cos_lat.append(math.cos(math.radians(lat)))
+            self._cells.setdefault(self._cell(lat, lon), []).append(index)
+        if self._cells:
+            rows = [row for row, _ in self._cells]
+            cols = [col for _, col in self._cells]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    @classmethod
+    def from_dealers(cls, dealers: Iterable[dict], cell_deg: float = 2.0) -> "GridIndex":
+        """Index dealers by their ``lat``/``long``, skipping unusable coordinates."""
+
+        def points():
+            for dealer in dealers:
+                try:
+                    lat, lon = float(dealer["lat"]), float(dealer["long"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if valid_coordinate(lat, lon):
+                    yield lat, lon, dealer
+
+        return cls(points(), cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _distance(self, index: int, phi: float, lam: float, cos_phi: float) -> float:
+        a = (
+            math.sin((self._lat[index] - phi) / 2) ** 2
+            + cos_phi * self._cos_lat[index] * math.sin((self._lon[index] - lam) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+    def _ring(self, row: int, col: int, radius: int) -> Iterable[int]:
+        """Point indexes in the cells exactly ``radius`` cells away from ``(row, col)``."""
+
+        for r in range(row - radius, row + radius + 1):
+            edge = r in (row - radius, row + radius)
+            for c in range(col - radius, col + radius + 1) if edge else (col - radius, col + radius):
+                yield from self._cells.get((r, c), ())
+
+    def _max_ring(self, row: int, col: int) -> int:
+        min_row, max_row, min_col, max_col = self._bounds
+        return max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+    def _ring_clearance_km(self, lat: float, lon: float, radius: int) -> float:
+        """Lower bound on the distance to any cell more than ``radius`` rings out."""
+
+        # Such a cell is at least ``radius`` whole cells away in latitude or in
+        # longitude.  A latitude gap is a distance on its own; a longitude gap
+        # shrinks with the cosine of the highest latitude either point can have.
+        degrees = radius * self.cell_deg
+        lat_km = degrees * KM_PER_DEGREE
+        if not (-180 < lon - degrees - self.cell_deg and lon + degrees + self.cell_deg < 180):
+            return 0.0  # the rings reach the antimeridian, where the grid wraps
+        widest_lat = min(90.0, abs(lat) + degrees + self.cell_deg)
+        lon_km = 2 * EARTH_RADIUS_KM * math.asin(
+            math.cos(math.radians(widest_lat)) * math.sin(math.radians(degrees) / 2)
+        )
+        return min(lat_km, lon_km)
+
+    def nearest(
+        self, lat: float, lon: float, k: int = 5, max_km: Optional[float] = None
+    ) -> List[Tuple[float, object]]:
+        """Up to ``k`` closest items as ``(distance_km, item)``, closest first."""
+
+        if not self.items or k <= 0:
+            return []
+        phi, lam, cos_phi = math.radians(lat), math.radians(lon), math.cos(math.radians(lat))
+        best: List[Tuple[float, int]] = []  # max-heap of the k best, as (-distance, index)
+
+        def consider(indexes: Iterable[int]) -> None:
+            for index in indexes:
+                distance = self._distance(index, phi, lam, cos_phi)
+                if max_km is not None and distance > max_km:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, index))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, index))
+
+        if len(self.items) <= LINEAR_SCAN_MAX:
+            consider(range(len(self.items)))
+            return self._ranked(best)
+
+        row, col = self._cell(lat, lon)
+        for radius in range(self._max_ring(row, col) + 1):
+            consider(self._ring(row, col, radius))
+            clearance = self._ring_clearance_km(lat, lon, radius)
+            if max_km is not None and clearance > max_km:
+                break
+            if len(best) == k and -best[0][0] <= clearance:
+                break
+        return self._ranked(best)
+
+    def _ranked(self, best: List[Tuple[float, int]]) -> List[Tuple[float, object]]:
+        # Closest first; equally distant points keep their indexing order.
+        return [(distance, self.items[index]) for distance, index in sorted((-n, i) for n, i in best)]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, object]]:
+        """Every item within ``radius_km``, closest first."""
+
+        return self.nearest(lat, lon, k=len(self.items), max_km=radius_km)
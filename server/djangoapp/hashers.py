@@ -0,0 +1,34 @@
+"""Password hashers whose cost is configured from settings.
+
+Both keep Django's algorithm names, so existing hashes stay valid.  When the
+configured cost (or ``PASSWORD_HASHER``) changes, ``User.check_password``
+notices through ``must_update`` and re-hashes the password with the new
+parameters on the user's next successful login.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 using ``PASSWORD_PBKDF2_ITERATIONS`` iterations."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", None) or PBKDF2PasswordHasher.iterations
+
+
+class ConfigurableArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with time/memory cost from ``PASSWORD_ARGON2_*`` (needs ``argon2-cffi``)."""
+
+    @property
+    def time_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_TIME_COST", None) or Argon2PasswordHasher.time_cost
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", None) or Argon2PasswordHasher.memory_cost
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "PASSWORD_ARGON2_PARALLELISM", None) or Argon2PasswordHasher.parallelism
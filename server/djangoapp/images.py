@@ -0,0 +1,185 @@
+"""Resized, content-addressed copies of the car catalogue images.
+
+``Car.image_url`` points at full-size originals on a third-party host.  Each
+image is downloaded once and resized into a few widths (``VARIANTS``), each
+encoded as WebP and JPEG and stored in the default storage (``MEDIA_ROOT``)
+under a name derived from its content hash.  A given name therefore never
+changes content, so the files can be cached forever by browsers and a CDN
+in front of ``MEDIA_URL``.  The result is recorded in ``Car.image_variants``
+together with the source URL, so editing ``image_url`` invalidates it.
+
+Variants are built by a background worker when a car is saved (see
+``djangoapp.signals``) and in bulk by ``manage.py build_car_images``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import queue
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+
+from . import catalogue
+from .models import Car
+
+logger = logging.getLogger(__name__)
+
+# Maximum width of each variant; images are never upscaled.
+VARIANTS = {"list": 480, "detail": 1280, "retina": 2560}
+# Variants used at 1x and 2x pixel density for each display size.
+DISPLAY_SIZES = {"list": ("list", "detail"), "detail": ("detail", "retina")}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+STORAGE_PREFIX = "cars"
+
+
+def download(url: str) -> bytes:
+    """Fetch an original image, refusing anything over ``CAR_IMAGE_MAX_BYTES``."""
+
+    import requests
+
+    limit = settings.CAR_IMAGE_MAX_BYTES
+    with requests.get(url, stream=True, timeout=settings.CAR_IMAGE_TIMEOUT) as response:
+        response.raise_for_status()
+        content = io.BytesIO()
+        for chunk in response.iter_content(64 * 1024):
+            content.write(chunk)
+            if content.tell() > limit:
+                raise ValueError(f"Image larger than {limit} bytes: {url}")
+    return content.getvalue()
+
+
+def render_variants(original: bytes) -> Dict[str, Dict[str, object]]:
+    """Resize ``original`` into every variant and encode it in every format.
+
+    Returns ``{variant: {"width": w, "height": h, fmt: encoded_bytes, ...}}``.
+    """
+
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(original)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    rendered: Dict[str, Dict[str, object]] = {}
+    for variant, max_width in VARIANTS.items():
+        resized = image
+        if image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            resized = image.resize((max_width, height), Image.Resampling.LANCZOS)
+        entry: Dict[str, object] = {"width": resized.width, "height": resized.height}
+        for fmt, (pil_format, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            entry[fmt] = buffer.getvalue()
+        rendered[variant] = entry
+    return rendered
+
+
+def store(content: bytes, extension: str) -> str:
+    """Save ``content`` under its content hash and return the storage name."""
+
+    digest = hashlib.sha256(content).hexdigest()[:20]
+    name = f"{STORAGE_PREFIX}/{digest}.{extension}"
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def build_car_images(car: Car, force: bool = False) -> bool:
+    """Create and record the variants of ``car.image_url``.
+
+    Returns ``False`` when there was nothing to do (no image, or variants of
+    the current URL already exist and ``force`` is not set).
+    """
+
+    if not car.image_url:
+        return False
+    if not force and car.image_variants.get("source") == car.image_url:
+        return False
+
+    rendered = render_variants(download(car.image_url))
+    variants: Dict[str, object] = {"source": car.image_url}
+    for variant, entry in rendered.items():
+        variants[variant] = {
+            "width": entry["width"],
+            "height": entry["height"],
+            **{fmt: store(entry[fmt], fmt) for fmt in FORMATS},
+        }
+    # update() leaves updated_at alone and does not re-trigger post_save.
+    Car.objects.filter(pk=car.pk, image_url=car.image_url).update(image_variants=variants)
+    car.image_variants = variants
+    catalogue.bump_version()
+    return True
+
+
+def variant_urls(car: Car, size: str = "list") -> Optional[Dict[str, object]]:
+    """URLs of the variants to display ``car`` at ``size`` (``list``/``detail``).
+
+    ``None`` until variants of the current ``image_url`` have been built;
+    callers then fall back to the original.
+    """
+
+    variants = car.image_variants or {}
+    if not car.image_url or variants.get("source") != car.image_url:
+        return None
+    base, double = (variants.get(name) for name in DISPLAY_SIZES[size])
+    if not base or not double:
+        return None
+    payload: Dict[str, object] = {"width": base["width"], "height": base["height"]}
+    for fmt in FORMATS:
+        payload[fmt] = default_storage.url(base[fmt])
+        payload[f"{fmt}_2x"] = default_storage.url(double[fmt])
+    return payload
+
+
+class ImageWorker:
+    """Daemon thread building variants for queued car ids, one at a time."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[int]" = queue.Queue()
+        self._pending: Set[int] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, car_ids: Iterable[int]) -> None:
+        with self._lock:
+            for car_id in car_ids:
+                if car_id not in self._pending:
+                    self._pending.add(car_id)
+                    self._queue.put(car_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="car-image-worker", daemon=True)
+                self._thread.start()
+
+    def join(self) -> None:
+        """Block until every queued car has been processed."""
+
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            car_id = self._queue.get()
+            with self._lock:
+                self._pending.discard(car_id)
+            try:
+                car = Car.objects.filter(pk=car_id).first()
+                if car is not None:
+                    build_car_images(car)
+            except Exception:
+                logger.exception("Building image variants for car %s failed", car_id)
+            finally:
+                self._queue.task_done()
+                if self._queue.empty():
+                    connections.close_all()
+
+
+worker = ImageWorker()
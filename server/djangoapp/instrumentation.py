@@ -0,0 +1,161 @@
+"""Per-request performance metrics for the djangoapp API.
+
+The :class:`~djangoapp.middleware.RequestMetricsMiddleware` activates a
+:class:`RequestMetrics` object for every request.  Code running inside the
+request (database wrappers, ``restapis`` calls and JSON encoding) adds to
+it through the helpers below, and the finished sample is kept in
+:data:`registry` so percentiles can be reported per URL name.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.http import JsonResponse as _JsonResponse
+
+METRIC_FIELDS = (
+    "total_ms",
+    "db_queries",
+    "db_ms",
+    "upstream_calls",
+    "upstream_ms",
+    "serialize_ms",
+)
+PERCENTILES = (50, 95, 99)
+
+
+class RequestMetrics:
+    """Counters collected while a single request is being handled."""
+
+    __slots__ = METRIC_FIELDS
+
+    def __init__(self) -> None:
+        self.total_ms = 0.0
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.upstream_calls = 0
+        self.upstream_ms = 0.0
+        self.serialize_ms = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting queries and their time."""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            field: round(value, 3) if isinstance(value, float) else value
+            for field, value in ((field, getattr(self, field)) for field in METRIC_FIELDS)
+        }
+
+    def server_timing(self) -> str:
+        """Render the metrics as a ``Server-Timing`` header value."""
+
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.2f};desc="{self.db_queries} queries"',
+                f'upstream;dur={self.upstream_ms:.2f};desc="{self.upstream_calls} calls"',
+                f"serialize;dur={self.serialize_ms:.2f}",
+                f"total;dur={self.total_ms:.2f}",
+            ]
+        )
+
+
+_current: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    "djangoapp_request_metrics", default=None
+)
+
+
+def activate(metrics: RequestMetrics) -> contextvars.Token:
+    return _current.set(metrics)
+
+
+def deactivate(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def track_upstream() -> Iterator[None]:
+    """Count one upstream HTTP call (and its duration) on the current request."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.upstream_calls += 1
+            metrics.upstream_ms += (time.perf_counter() - started) * 1000
+
+
+class JsonResponse(_JsonResponse):
+    """``JsonResponse`` that records its encoding time on the current request."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        started = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.serialize_ms += (time.perf_counter() - started) * 1000
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class MetricsRegistry:
+    """Bounded, per-process samples of request metrics keyed by URL name."""
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[Dict[str, float]]] = defaultdict(
+            lambda: deque(maxlen=self.max_samples)
+        )
+        self._lock = threading.Lock()
+
+    def record(self, url_name: str, metrics: RequestMetrics) -> None:
+        sample = metrics.as_dict()
+        with self._lock:
+            self._samples[url_name].append(sample)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+
+        result: Dict[str, Dict[str, object]] = {}
+        for name, samples in sorted(snapshot.items()):
+            fields: Dict[str, Dict[str, float]] = {}
+            for field in METRIC_FIELDS:
+                values = sorted(sample[field] for sample in samples)
+                fields[field] = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+                fields[field]["max"] = values[-1]
+            result[name] = {"count": len(samples), "metrics": fields}
+        return result
+
+
+registry = MetricsRegistry(getattr(settings, "REQUEST_METRICS_MAX_SAMPLES", 1000))
@@ -0,0 +1,287 @@
+"""Dealer inventory served from an in-memory columnar index.
+
+The inventory is the list of car records (``make``, ``model``, ``bodyType``,
+``year``, ``mileage``, ``dealer_id``) from ``car_records.json`` in
+``settings.DEALER_DATA_DIR``, or from the dealer backend when
+``INVENTORY_ENDPOINT`` is set.  :class:`InventoryIndex` stores it by column:
+
+* categorical columns (dealer, make, model, body type) are dictionary
+  encoded and keep one bitmap per value;
+* numeric columns (year, mileage) keep their rows in sorted order plus the
+  bitmaps of every ``block``-th prefix of that order, so a range becomes a
+  prefix bitmap and a short sorted slice.
+
+Bitmaps are Python ints with bit ``i`` set for row ``i``; a query ANDs one
+bitmap per predicate and counts facets with ``int.bit_count``, which runs
+over machine words instead of Python objects.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from . import restapis
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL = {"dealer_id": "dealer_id", "make": "make", "model": "model", "body_type": "bodyType"}
+NUMERIC = {"year": "year", "mileage": "mileage"}
+FACETS = ("make", "body_type")
+MAX_PREFIXES = 64
+
+
+def bitmap_from_rows(rows: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_bits(bitmap: int) -> Iterable[int]:
+    """Row numbers set in ``bitmap``, in ascending order."""
+
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (offset << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class CategoricalColumn:
+    """Dictionary-encoded column with one bitmap per distinct value."""
+
+    def __init__(self, values: Sequence[object], size: int) -> None:
+        self.labels: List[object] = []
+        self.codes: Dict[object, int] = {}
+        self.column = array("I")
+        bits: List[bytearray] = []
+        for row, value in enumerate(values):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.labels)
+                self.labels.append(value)
+                bits.append(bytearray((size + 7) // 8))
+            self.column.append(code)
+            bits[code][row >> 3] |= 1 << (row & 7)
+        self.bitmaps = [int.from_bytes(chunk, "little") for chunk in bits]
+
+    def bitmap(self, value: object) -> int:
+        code = self.codes.get(value)
+        return 0 if code is None else self.bitmaps[code]
+
+    def counts(self, within: int) -> Dict[object, int]:
+        counts = {}
+        for label, bitmap in zip(self.labels, self.bitmaps):
+            count = (bitmap & within).bit_count()
+            if count:
+                counts[label] = count
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], str(item[0]))))
+
+
+class NumericColumn:
+    """Integer column answering inclusive range queries with bitmaps."""
+
+    def __init__(self, values: Sequence[int], size: int, block: int) -> None:
+        self.size = size
+        # At most MAX_PREFIXES prefix bitmaps of size / 8 bytes each.
+        self.block = block = max(block, -(-size // MAX_PREFIXES))
+        self.column = array("q", values)
+        self.order = array("I", sorted(range(size), key=self.column.__getitem__))
+        self.sorted_values = array("q", (self.column[row] for row in self.order))
+        # prefixes[j]: rows at sorted positions < j * block.
+        self.prefixes = [0]
+        bits = bytearray((size + 7) // 8)
+        for position, row in enumerate(self.order, start=1):
+            bits[row >> 3] |= 1 << (row & 7)
+            if position % block == 0:
+                self.prefixes.append(int.from_bytes(bits, "little"))
+
+    def _below(self, position: int) -> int:
+        """Bitmap of the rows at sorted positions before ``position``."""
+
+        block = position // self.block
+        start = block * self.block
+        return self.prefixes[block] | bitmap_from_rows(self.order[start:position], self.size)
+
+    def between(self, low: Optional[int], high: Optional[int]) -> int:
+        end = self.size if high is None else bisect_right(self.sorted_values, high)
+        start = 0 if low is None else bisect_left(self.sorted_values, low)
+        if start >= end:
+            return 0
+        bitmap = self._below(end)
+        if start:
+            bitmap &= ~self._below(start)
+        return bitmap
+
+
+class InventoryIndex:
+    """Immutable columnar index over a list of car records."""
+
+    def __init__(self, records: Sequence[dict], block: int = 4096) -> None:
+        self.size = len(records)
+        self.all = (1 << self.size) - 1
+        self.categorical = {
+            name: CategoricalColumn([record.get(field) for record in records], self.size)
+            for name, field in CATEGORICAL.items()
+        }
+        self.numeric = {
+            name: NumericColumn([int(record.get(field) or 0) for record in records], self.size, block)
+            for name, field in NUMERIC.items()
+        }
+        self.dealer_counts: Dict[int, int] = {
+            int(dealer): bitmap.bit_count()
+            for dealer, bitmap in zip(self.categorical["dealer_id"].labels, self.categorical["dealer_id"].bitmaps)
+            if dealer is not None
+        }
+
+    def match(
+        self,
+        equals: Optional[Dict[str, Iterable[object]]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+    ) -> int:
+        """Bitmap of the rows matching every predicate.
+
+        ``equals`` maps a categorical column to the accepted values (any of
+        them); ``ranges`` maps a numeric column to inclusive ``(low, high)``
+        bounds, either of which may be ``None``.
+        """
+
+        bitmap = self.all
+        for name, values in (equals or {}).items():
+            column = self.categorical[name]
+            accepted = 0
+            for value in values:
+                accepted |= column.bitmap(value)
+            bitmap &= accepted
+            if not bitmap:
+                return 0
+        for name, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            bitmap &= self.numeric[name].between(low, high)
+            if not bitmap:
+                return 0
+        return bitmap
+
+    def facets(self, bitmap: int, names: Iterable[str] = FACETS) -> Dict[str, Dict[object, int]]:
+        return {name: self.categorical[name].counts(bitmap) for name in names}
+
+    def rows(self, bitmap: int, offset: int = 0, limit: int = 50) -> List[Dict[str, object]]:
+        """Decoded records for the matching rows ``offset`` .. ``offset + limit``."""
+
+        rows = []
+        for position, row in enumerate(iter_bits(bitmap)):
+            if position < offset:
+                continue
+            if len(rows) >= limit:
+                break
+            record: Dict[str, object] = {}
+            for name, column in self.categorical.items():
+                record[name] = column.labels[column.column[row]]
+            for name, column in self.numeric.items():
+                record[name] = column.column[row]
+            rows.append(record)
+        return rows
+
+
+def load_records() -> Optional[List[dict]]:
+    """Car records from the backend (``INVENTORY_ENDPOINT``) or the seed file."""
+
+    endpoint = settings.INVENTORY_ENDPOINT
+    if endpoint:
+        records = restapis.get_request(endpoint)
+        if isinstance(records, dict):
+            records = records.get("cars")
+        return records if isinstance(records, list) else None
+    path = Path(settings.DEALER_DATA_DIR) / "car_records.json"
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)["cars"]
+    except (OSError, ValueError, KeyError):
+        logger.exception("Could not read car records from %s", path)
+        return None
+
+
+class Inventory:
+    """The current :class:`InventoryIndex`, rebuilt in the background when stale.
+
+    Like the dealer directory, a stale index keeps being served while a
+    refresh runs, and a failed load is retried after ``retry_after`` seconds.
+    """
+
+    def __init__(self, loader=load_records, retry_after: float = 30.0) -> None:
+        self.loader = loader
+        self.retry_after = retry_after
+        self._index: Optional[InventoryIndex] = None
+        self._loaded_at = 0.0
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def index(self) -> Optional[InventoryIndex]:
+        index = self._index
+        now = time.monotonic()
+        if index is None:
+            with self._lock:
+                if self._index is None and now >= self._next_attempt:
+                    self._load(now)
+                return self._index
+        if now - self._loaded_at >= settings.INVENTORY_TTL:
+            self._refresh_in_background(now)
+        return index
+
+    def refresh(self) -> bool:
+        with self._lock:
+            return self._load(time.monotonic())
+
+    def _load(self, now: float) -> bool:
+        try:
+            records = self.loader()
+            index = InventoryIndex(records) if records is not None else None
+        except Exception:
+            logger.exception("Inventory refresh failed")
+            index = None
+        if index is None:
+            # Keep serving whatever we have and retry later, not on every request.
+            self._next_attempt = now + self.retry_after
+            logger.warning(
+                "Inventory unavailable, %s", "serving stale index" if self._index else "no index loaded yet"
+            )
+            return False
+        self._index = index
+        self._loaded_at = time.monotonic()
+        return True
+
+    def _refresh_in_background(self, now: float) -> None:
+        with self._lock:
+            if self._refreshing or now < self._next_attempt:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="inventory-refresh", daemon=True).start()
+
+
+inventory = Inventory()
+
+
+def dealer_inventory_counts() -> Optional[Dict[int, int]]:
+    """Number of cars in stock per dealer id; ``None`` if the inventory is unavailable."""
+
+    index = inventory.index()
+    return index.dealer_counts if index is not None else None
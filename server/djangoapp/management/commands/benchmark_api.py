@@ -0,0 +1,92 @@
+"""Benchmark the djangoapp API against a synthetic dataset."""
+
+import logging
+from dataclasses import replace
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from djangoapp import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throw-away test database and report throughput, p50/p95/p99 "
+        "latency and query counts for the main API endpoints as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="small")
+        for field in benchmark.scale_as_dict(benchmark.Scale()):
+            parser.add_argument(f"--{field.replace('_', '-')}", type=int, dest=field)
+        parser.add_argument("--mode", choices=["client", "wsgi", "both"], default="both")
+        parser.add_argument(
+            "--session-backend",
+            choices=["db", "cached_db", "cache", "signed_cookies"],
+            help="Session engine to benchmark with (defaults to the configured one).",
+        )
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument("--compare", help="Earlier results file to compare against.")
+
+    def handle(self, *args, **options):
+        scale = benchmark.SCALES[options["scale"]]
+        overrides = {
+            field: options[field]
+            for field in benchmark.scale_as_dict(scale)
+            if options.get(field) is not None
+        }
+        scale = replace(scale, **overrides)
+
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = benchmark.load_results(options["compare"])
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        # One log line per request would dominate the measurements.
+        logging.getLogger("djangoapp.metrics").setLevel(logging.WARNING)
+
+        session_engine = settings.SESSION_ENGINE
+        if options["session_backend"]:
+            session_engine = f"django.contrib.sessions.backends.{options['session_backend']}"
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            dataset = benchmark.seed_dataset(scale, seed=options["seed"])
+            scenarios = benchmark.build_scenarios(dataset)
+            results = []
+            with override_settings(SESSION_ENGINE=session_engine):
+                if options["mode"] in ("client", "both"):
+                    results += benchmark.run_client(
+                        scenarios, dataset, options["iterations"], options["warmup"]
+                    )
+                if options["mode"] in ("wsgi", "both"):
+                    results += benchmark.run_wsgi(
+                        scenarios, dataset, options["iterations"], options["warmup"]
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        meta = benchmark.report_meta(
+            scale=benchmark.scale_as_dict(scale),
+            session_engine=session_engine,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+        )
+        benchmark.write_report(options["output"], meta, results)
+
+        for row in results:
+            self.stdout.write(benchmark.format_row(row))
+        if baseline is not None:
+            for row in benchmark.compare(results, baseline):
+                self.stdout.write(benchmark.format_comparison(row))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,77 @@
+"""Benchmark the dealer views against in-process fake upstreams."""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from djangoapp import benchmark
+
+
+def _float_list(value):
+    try:
+        return [float(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise CommandError(f"Expected a comma separated list of numbers, got {value!r}.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve dealerships.json and reviews.json from fake dealer and sentiment "
+        "services with injected latency and error rates, and report how "
+        "get_dealerships, get_dealer_details and get_dealer_reviews degrade."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--latencies",
+            default="0,10,50",
+            help="Comma separated upstream latencies in milliseconds.",
+        )
+        parser.add_argument(
+            "--error-rates",
+            default="0,0.05",
+            help="Comma separated fractions of upstream calls answered with HTTP 500.",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark-results-dealers.json")
+        parser.add_argument("--compare", help="Earlier results file to compare against.")
+
+    def handle(self, *args, **options):
+        latencies = _float_list(options["latencies"])
+        error_rates = _float_list(options["error_rates"])
+
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = benchmark.load_results(options["compare"])
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        logging.getLogger("djangoapp.metrics").setLevel(logging.WARNING)
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+        # The dealer views only talk to the upstreams, so no test database is needed.
+        setup_test_environment()
+        try:
+            results = benchmark.run_dealer_matrix(
+                latencies, error_rates, options["iterations"], options["warmup"], seed=options["seed"]
+            )
+        finally:
+            teardown_test_environment()
+        meta = benchmark.report_meta(
+            upstream_latencies_ms=latencies,
+            upstream_error_rates=error_rates,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+        )
+        benchmark.write_report(options["output"], meta, results)
+
+        for row in results:
+            self.stdout.write(benchmark.format_row(row))
+        if baseline is not None:
+            for row in benchmark.compare(results, baseline):
+                self.stdout.write(benchmark.format_comparison(row))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,83 @@
+"""Measure concurrent write throughput of the configured database profile."""
+
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from djangoapp import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throw-away test database and run favourite toggles, comment "
+        "posts and like toggles from parallel threads, reporting write "
+        "throughput, latency and failed requests for the DATABASE_PROFILE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="small")
+        parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument("--operations", type=int, default=60, help="Requests per thread.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--sqlite-defaults",
+            action="store_true",
+            help="Drop the SQLite tuning (WAL, busy timeout, IMMEDIATE) to get a baseline.",
+        )
+        parser.add_argument("--output", default="benchmark-results-writes.json")
+
+    def handle(self, *args, **options):
+        logging.getLogger("djangoapp.metrics").setLevel(logging.WARNING)
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+        profile = settings.DATABASE_PROFILE
+        db_settings = connection.settings_dict
+        test_file = None
+        if connection.vendor == "sqlite":
+            if options["sqlite_defaults"]:
+                db_settings["OPTIONS"] = {}
+                profile += "-defaults"
+            # Journaling modes only matter for a file, so avoid the in-memory test database.
+            handle, test_file = tempfile.mkstemp(prefix="benchmark-writes-", suffix=".sqlite3")
+            os.close(handle)
+            db_settings["TEST"]["NAME"] = test_file
+        elif db_settings.get("OPTIONS", {}).get("pool"):
+            profile += "-pool"
+
+        threads = max(options["threads"])
+        scale = benchmark.SCALES[options["scale"]]
+        if scale.users < threads:
+            scale = benchmark.Scale(**{**benchmark.scale_as_dict(scale), "users": threads})
+
+        setup_test_environment()
+        old_name = db_settings["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            benchmark.seed_dataset(scale, seed=options["seed"])
+            results = []
+            for count in options["threads"]:
+                row = benchmark.run_write_concurrency(count, options["operations"], seed=options["seed"])
+                row["profile"] = profile
+                results.append(row)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if test_file:
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(test_file + suffix):
+                        os.remove(test_file + suffix)
+
+        meta = benchmark.report_meta(
+            profile=profile,
+            scale=benchmark.scale_as_dict(scale),
+            operations_per_thread=options["operations"],
+        )
+        benchmark.write_report(options["output"], meta, results)
+        for row in results:
+            self.stdout.write(f"{profile:16} threads {row['threads']:>3}  " + benchmark.format_row(row))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
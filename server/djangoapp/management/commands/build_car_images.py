@@ -0,0 +1,49 @@
+"""Download car images once and store their resized variants under MEDIA_ROOT."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from djangoapp.images import build_car_images
+from djangoapp.models import Car
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the list/detail/retina WebP and JPEG variants of every car image "
+        "(or the given car ids) that does not have them yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("car_ids", nargs="*", type=int)
+        parser.add_argument("--force", action="store_true", help="Rebuild variants that already exist.")
+        parser.add_argument("--workers", type=int, default=4, help="Images downloaded in parallel.")
+
+    def handle(self, *args, **options):
+        cars = Car.objects.exclude(image_url="").order_by("id")
+        if options["car_ids"]:
+            cars = cars.filter(id__in=options["car_ids"])
+        force = options["force"]
+
+        def build(car):
+            try:
+                return car, build_car_images(car, force=force), None
+            except Exception as err:  # reported per car, the others still run
+                return car, False, err
+            finally:
+                connections.close_all()
+
+        built = skipped = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            for car, done, error in pool.map(build, list(cars)):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"Car {car.id} ({car.image_url}): {error}")
+                elif done:
+                    built += 1
+                else:
+                    skipped += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Built variants for {built} cars, {skipped} up to date, {failed} failed.")
+        )
@@ -0,0 +1,35 @@
+"""Precompute the "users who favourited this also favourited" cars."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the related cars of every car from the favourites, or with "
+        "--incremental only those affected by favourite changes since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--incremental", action="store_true", help="Only rebuild stale cars.")
+        parser.add_argument(
+            "--k", type=int, default=settings.RELATED_CARS_K, help="Neighbours stored per car."
+        )
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=1,
+            help="Split a full build into this many passes over the favourites to use less memory.",
+        )
+
+    def handle(self, *args, **options):
+        if options["k"] <= 0 or options["partitions"] <= 0:
+            raise CommandError("--k and --partitions must be positive.")
+        if options["incremental"]:
+            refreshed = recommendations.refresh(k=options["k"])
+            self.stdout.write(self.style.SUCCESS(f"Refreshed the related cars of {refreshed} cars."))
+            return
+        related = recommendations.build(k=options["k"], partitions=options["partitions"])
+        self.stdout.write(self.style.SUCCESS(f"Built related cars for {related} cars."))
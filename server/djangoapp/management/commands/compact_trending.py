@@ -0,0 +1,24 @@
+"""Clear decayed trending scores, or recompute them all from the events."""
+
+from django.core.management.base import BaseCommand
+
+from djangoapp import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Clear the trending scores that decayed below TRENDING_MIN_SCORE; with --rebuild, "
+        "recompute every score from the favourites, comments and likes first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild", action="store_true", help="Recompute the scores, dropping accumulated rounding."
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            scored = trending.rebuild()
+            self.stdout.write(f"Recomputed the trending scores of {scored} cars.")
+        cleared = trending.compact()
+        self.stdout.write(self.style.SUCCESS(f"Cleared {cleared} decayed trending scores."))
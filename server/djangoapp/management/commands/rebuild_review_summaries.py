@@ -0,0 +1,32 @@
+"""Recompute the per-dealer review summaries from the dealer backend."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import review_summaries
+from djangoapp.dealers import directory
+
+
+class Command(BaseCommand):
+    help = "Rebuild DealerReviewSummary rows for every dealer (or the given ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dealer_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.REVIEW_EXPORT_BATCH_SIZE,
+            help="Reviews sent to the sentiment analyzer per call.",
+        )
+
+    def handle(self, *args, **options):
+        dealer_ids = options["dealer_ids"]
+        if not dealer_ids:
+            snapshot = directory.snapshot()
+            if snapshot is None:
+                raise CommandError("The dealer backend is unavailable.")
+            dealer_ids = sorted(snapshot.by_id)
+
+        rebuilt = review_summaries.rebuild(dealer_ids, batch_size=options["batch_size"])
+        skipped = len(dealer_ids) - len(rebuilt)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rebuilt)} summaries, skipped {skipped}."))
@@ -0,0 +1,112 @@
+"""Profile worker start-up: boot time, memory and the slowest imports."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: what a gunicorn worker does before its first request.
+BOOT_SNIPPET = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djangoproj.settings")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "boot_ms": (time.perf_counter() - started) * 1000,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "loaded": sorted(name for name in %r if name in sys.modules),
+}))
+"""
+
+# Modules that should only be imported once a request needs them.
+WATCHED_MODULES = ("requests", "dotenv", "djangoapp.populate", "PIL")
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into ``(module, self_us, cumulative_us)`` rows."""
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header line
+        rows.append((fields[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the WSGI application in fresh interpreters under `python -X importtime` "
+        "and report boot time, peak RSS and the most expensive imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Boots to measure (median is reported).")
+        parser.add_argument("--top", type=int, default=15, help="Imports to list per ranking.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def _boot(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "djangoproj.settings")}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SNIPPET % (WATCHED_MODULES,)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Application failed to boot:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+        boots = [self._boot() for _ in range(runs)]
+        stats = [boot[0] for boot in boots]
+        imports = boots[-1][1]
+        top = options["top"]
+
+        report = {
+            "runs": runs,
+            "boot_ms": round(statistics.median(stat["boot_ms"] for stat in stats), 1),
+            "max_rss_kb": int(statistics.median(stat["max_rss_kb"] for stat in stats)),
+            "modules": stats[-1]["modules"],
+            "watched_modules_loaded": stats[-1]["loaded"],
+            "top_self": [
+                {"module": name, "self_us": self_us}
+                for name, self_us, _ in sorted(imports, key=lambda row: row[1], reverse=True)[:top]
+            ],
+            "top_cumulative": [
+                {"module": name, "cumulative_us": cumulative_us}
+                for name, _, cumulative_us in sorted(imports, key=lambda row: row[2], reverse=True)[:top]
+            ],
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Boot: {report['boot_ms']} ms (median of {runs}), peak RSS {report['max_rss_kb']} KB, "
+            f"{report['modules']} modules"
+        )
+        loaded = ", ".join(report["watched_modules_loaded"]) or "none"
+        self.stdout.write(f"Lazy modules loaded at boot: {loaded}")
+        self.stdout.write("\nSlowest imports (self):")
+        for row in report["top_self"]:
+            self.stdout.write(f"  {row['self_us'] / 1000:8.1f} ms  {row['module']}")
+        self.stdout.write("\nSlowest imports (cumulative):")
+        for row in report["top_cumulative"]:
+            self.stdout.write(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
@@ -0,0 +1,32 @@
+"""Copy the SQLite primary into the SQLite file standing in for the replica."""
+
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from djangoapp.routers import PRIMARY, REPLICA
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the local replica database (DATABASE_REPLICA_NAME) from the "
+        "primary using SQLite's online backup API."
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.settings:
+            raise CommandError("No replica configured; set DATABASE_REPLICA_NAME.")
+        primary, replica = connections[PRIMARY], connections[REPLICA]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Only SQLite primaries and replicas can be synced locally.")
+
+        replica.close()
+        source = sqlite3.connect(str(primary.settings_dict["NAME"]))
+        target = sqlite3.connect(str(replica.settings_dict["NAME"]))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Replica {replica.settings_dict['NAME']} synced."))
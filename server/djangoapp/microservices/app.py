@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, request
 from nltk.sentiment import SentimentIntensityAnalyzer
 import json
 app = Flask("Sentiment Analyzer")
@@ -17,17 +17,28 @@ def analyze_sentiment(input_txt):
 
     scores = sia.polarity_scores(input_txt)
     print(scores)
+    res = classify(scores)
+    res = json.dumps({"sentiment": res})
+    return res
+
+
+@app.post('/analyze')
+def analyze_sentiments():
+    # Batch variant: {"texts": [...]} -> {"sentiments": [...]} in the same order
+    texts = (request.get_json(silent=True) or {}).get("texts") or []
+    sentiments = [classify(sia.polarity_scores(str(text))) for text in texts]
+    return json.dumps({"sentiments": sentiments})
+
+
+def classify(scores):
     pos = float(scores['pos'])
     neg = float(scores['neg'])
     neu = float(scores['neu'])
     res = "positive"
-    print("pos neg nue ", pos, neg, neu)
     if (neg > pos and neg > neu):
         res = "negative"
     elif (neu > neg and neu > pos):
         res = "neutral"
-    res = json.dumps({"sentiment": res})
-    print(res)
     return res
 
 
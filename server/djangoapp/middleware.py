@@ -0,0 +1,107 @@
+"""Middleware for the djangoapp application."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentation, routers
+
+logger = logging.getLogger("djangoapp.metrics")
+
+
+class RequestMetricsMiddleware:
+    """Record query, upstream and serialization costs of every request.
+
+    The totals are exposed as a ``Server-Timing`` header, written as one JSON
+    log line on the ``djangoapp.metrics`` logger and sampled into
+    :data:`djangoapp.instrumentation.registry` under the resolved URL name.
+    It should be listed first in ``MIDDLEWARE`` so session and authentication
+    queries are counted as well.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.activate(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        metrics.total_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match else None
+
+        response["Server-Timing"] = metrics.server_timing()
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_metrics",
+                    "method": request.method,
+                    "path": request.path,
+                    "url_name": url_name,
+                    "status": response.status_code,
+                    **metrics.as_dict(),
+                }
+            )
+        )
+        if url_name:
+            instrumentation.registry.record(url_name, metrics)
+        return response
+
+
+class ReplicaReadMiddleware:
+    """Serve the read-only catalogue views from the read replica.
+
+    Safe requests to the URL names in ``REPLICA_READ_VIEWS`` read from the
+    replica.  After a request that wrote to the database, an existing
+    session is pinned to the primary for ``REPLICA_STICKY_SECONDS`` so the
+    user reads their own writes while the replica catches up; no session is
+    created just for that.  Must come after ``SessionMiddleware``.
+    """
+
+    session_key = "_db_primary_until"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        write_token = routers.begin_write_tracking()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_write_tracking(write_token)
+            token = getattr(request, "_replica_token", None)
+            if token is not None:
+                routers.end_replica_reads(token)
+        session = getattr(request, "session", None)
+        if wrote and session is not None and session.session_key and routers.replica_configured():
+            session[self.session_key] = time.time() + settings.REPLICA_STICKY_SECONDS
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if request.resolver_match.url_name not in settings.REPLICA_READ_VIEWS:
+            return None
+        session = getattr(request, "session", None)
+        if session is not None and session.get(self.session_key, 0) > time.time():
+            return None
+        # Resolve the session user on the primary; a new account may not be replicated yet.
+        user = getattr(request, "user", None)
+        if user is not None:
+            user.is_authenticated  # noqa: B018 - forces the lazy lookup now
+        request._replica_token = routers.begin_replica_reads()
+        return None
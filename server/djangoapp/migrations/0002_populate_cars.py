@@ -6,7 +6,7 @@ from django.db import migrations
 def populate_cars(apps, schema_editor):
     from djangoapp.populate import initiate
 
-    initiate()
+    initiate(apps.get_model("djangoapp", "Car"), apps.get_model("djangoapp", "CarMake"))
 
 
 class Migration(migrations.Migration):
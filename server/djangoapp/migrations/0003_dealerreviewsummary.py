@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0002_populate_cars"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DealerReviewSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dealer_id", models.PositiveIntegerField(unique=True)),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("positive", models.PositiveIntegerField(default=0)),
+                ("neutral", models.PositiveIntegerField(default=0)),
+                ("negative", models.PositiveIntegerField(default=0)),
+                ("purchases", models.PositiveIntegerField(default=0)),
+                ("by_make", models.JSONField(blank=True, default=dict)),
+                ("by_year", models.JSONField(blank=True, default=dict)),
+                ("by_month", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "dealer review summaries",
+                "ordering": ["dealer_id"],
+            },
+        ),
+    ]
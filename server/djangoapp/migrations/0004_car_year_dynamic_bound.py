@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:45
+
+import django.core.validators
+import djangoapp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0003_dealerreviewsummary"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="car",
+            name="year",
+            field=models.IntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1990),
+                    django.core.validators.MaxValueValidator(
+                        djangoapp.models.max_car_year
+                    ),
+                ]
+            ),
+        ),
+    ]
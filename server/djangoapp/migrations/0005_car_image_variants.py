@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0004_car_year_dynamic_bound"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0005_car_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedCars",
+            fields=[
+                (
+                    "car",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="related_cars",
+                        serialize=False,
+                        to="djangoapp.car",
+                    ),
+                ),
+                ("neighbors", models.JSONField(blank=True, default=list)),
+                (
+                    "stale_since",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "related cars",
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0006_relatedcars"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="trending_score",
+            field=models.FloatField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+    ]
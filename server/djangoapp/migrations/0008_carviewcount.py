@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djangoapp", "0007_car_trending_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CarViewCount",
+            fields=[
+                (
+                    "car",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="view_count",
+                        serialize=False,
+                        to="djangoapp.car",
+                    ),
+                ),
+                ("views", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
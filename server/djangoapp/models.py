@@ -6,6 +6,12 @@ from django.db import models
 from django.utils import timezone
 
 
+def max_car_year() -> int:
+    """Latest accepted model year, evaluated on each validation."""
+
+    return timezone.now().year + 1
+
+
 class CarMake(models.Model):
     """Represents a car manufacturer/brand."""
 
@@ -47,11 +53,15 @@ class Car(models.Model):
     year = models.IntegerField(
         validators=[
             MinValueValidator(1990),
-            MaxValueValidator(timezone.now().year + 1),
+            MaxValueValidator(max_car_year),
         ]
     )
     price = models.DecimalField(max_digits=12, decimal_places=2)
     image_url = models.URLField(blank=True)
+    # Resized copies of ``image_url`` under MEDIA_ROOT, see djangoapp.images.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Log of the time-decayed popularity, see djangoapp.trending.
+    trending_score = models.FloatField(null=True, blank=True, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -137,4 +147,72 @@ class CommentLike(models.Model):
         ordering = ["-created_at"]
 
     def __str__(self) -> str:
-        return f"{self.user} likes comment {self.comment_id}"
\ No newline at end of file
+        return f"{self.user} likes comment {self.comment_id}"
+
+
+class RelatedCars(models.Model):
+    """Precomputed "users who favourited this also favourited" cars.
+
+    ``neighbors`` holds ``[car_id, score, shared_users]`` entries, best first,
+    as built by ``djangoapp.recommendations``.  ``stale_since`` is set when a
+    favourite change may have altered them and cleared when they are rebuilt.
+    """
+
+    car = models.OneToOneField(
+        Car,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="related_cars",
+    )
+    neighbors = models.JSONField(default=list, blank=True)
+    stale_since = models.DateTimeField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "related cars"
+
+    def __str__(self) -> str:
+        return f"Cars related to {self.car_id}"
+
+
+class CarViewCount(models.Model):
+    """Number of times a car's detail page was viewed, see ``djangoapp.car_views``."""
+
+    car = models.OneToOneField(
+        Car,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="view_count",
+    )
+    views = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.views} views of car {self.car_id}"
+
+
+class DealerReviewSummary(models.Model):
+    """Precomputed review statistics for one dealership.
+
+    Reviews live in the dealer backend, so this row is kept up to date when
+    ``add_review`` posts a new review and can be rebuilt in bulk with the
+    ``rebuild_review_summaries`` management command.
+    """
+
+    dealer_id = models.PositiveIntegerField(unique=True)
+    total = models.PositiveIntegerField(default=0)
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    purchases = models.PositiveIntegerField(default=0)
+    by_make = models.JSONField(default=dict, blank=True)
+    by_year = models.JSONField(default=dict, blank=True)
+    by_month = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["dealer_id"]
+        verbose_name_plural = "dealer review summaries"
+
+    def __str__(self) -> str:
+        return f"Review summary for dealer {self.dealer_id}"
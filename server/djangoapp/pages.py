@@ -0,0 +1,36 @@
+"""Views for the server-rendered pages that do not depend on the request.
+
+``Home.html``, ``About.html`` and the other front-end pages only use
+``{% static %}``; login state is handled in the browser.  They are rendered
+without a request, so no context processor runs and the session is never
+touched (which would add ``Vary: Cookie``), and the response is cached per
+URL with ``cache_page``.  One cached copy is shared by anonymous and
+authenticated visitors; a response that does vary on the cookie is cached
+per cookie by ``cache_page`` instead.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.views import View
+from django.views.decorators.cache import cache_page
+
+
+class StaticPageView(View):
+    """Render ``template_name`` to bytes without a request context."""
+
+    template_name = None
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, *args, **kwargs):
+        content = get_template(self.template_name).render()
+        return HttpResponse(content, content_type="text/html; charset=utf-8")
+
+
+def static_page(template_name: str):
+    """Cached replacement for ``TemplateView.as_view(template_name=...)``."""
+
+    view = StaticPageView.as_view(template_name=template_name)
+    return cache_page(settings.STATIC_PAGE_CACHE_SECONDS, key_prefix="static-page")(view)
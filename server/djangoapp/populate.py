@@ -5,8 +5,12 @@ from decimal import Decimal
 from .models import Car, CarMake
 
 
-def initiate():
-    """Populate the database with a curated catalogue of luxury cars."""
+def initiate(car_model=Car, make_model=CarMake):
+    """Populate the database with a curated catalogue of luxury cars.
+
+    Data migrations pass their historical ``Car``/``CarMake`` models, which
+    may lack fields added to the models later.
+    """
 
     cars_catalogue = [
         {
@@ -289,12 +293,12 @@ def initiate():
 
     for entry in cars_catalogue:
         make_info = entry["make"]
-        make, _ = CarMake.objects.get_or_create(
+        make, _ = make_model.objects.get_or_create(
             name=make_info["name"],
             defaults={"description": make_info.get("description", "")},
         )
         for model in entry["models"]:
-            Car.objects.get_or_create(
+            car_model.objects.get_or_create(
                 make=make,
                 name=model["name"],
                 year=model["year"],
@@ -0,0 +1,187 @@
+"""Item-item recommendations from co-favourited cars.
+
+Two cars are related when the same users favourited both.  The score is the
+cosine similarity of their favouriting users,
+``shared / sqrt(favourites(a) * favourites(b))``, and the best ``RELATED_CARS_K``
+neighbours of every car are stored in :class:`RelatedCars`, so serving them
+is one primary-key lookup.
+
+:func:`build` streams ``Favorite`` rows ordered by user and counts the
+co-occurrences of each user's basket with ``Counter.update`` over
+``itertools.product``, which runs in C.  Memory depends on the number of
+distinct co-favourited pairs, not on the number of favourites, and
+``partitions`` splits the cars into that many passes to bound it further.
+
+Favourite writes mark the affected rows stale (:func:`mark_stale`);
+:func:`refresh` rebuilds only those, reading just the favourites of the
+users who favourited them.  A refresh does not rescale the scores other
+cars give to a car whose favourite count changed, so a periodic full
+:func:`build` is still worthwhile.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from collections import Counter
+from itertools import product
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Car, Favorite, RelatedCars
+
+logger = logging.getLogger(__name__)
+
+# Users with more favourites than this only add to the favourite counts;
+# such baskets cost quadratic time and say little about similarity.
+MAX_BASKET = 500
+CHUNK_SIZE = 10000
+REFRESH_BATCH = 500
+
+Neighbors = List[List[float]]
+
+
+def favorite_counts() -> Dict[int, int]:
+    return dict(Favorite.objects.values_list("car_id").annotate(count=Count("id")).order_by())
+
+
+def _baskets(rows: Iterable[Tuple[int, int]]) -> Iterable[List[int]]:
+    """Group ``(user_id, car_id)`` rows ordered by user into per-user car lists."""
+
+    basket: List[int] = []
+    current = None
+    for user_id, car_id in rows:
+        if user_id != current:
+            if basket:
+                yield basket
+            basket, current = [], user_id
+        basket.append(car_id)
+    if basket:
+        yield basket
+
+
+def _neighbors(
+    rows: Iterable[Tuple[int, int]],
+    is_anchor: Callable[[int], bool],
+    counts: Dict[int, int],
+    k: int,
+) -> Dict[int, Neighbors]:
+    """Top ``k`` neighbours of every anchor car appearing in ``rows``."""
+
+    pairs: Counter = Counter()
+    for basket in _baskets(rows):
+        if len(basket) > MAX_BASKET:
+            continue
+        anchors = [car_id for car_id in basket if is_anchor(car_id)]
+        if anchors:
+            pairs.update(product(anchors, basket))
+
+    candidates: Dict[int, List[Tuple[float, int, int]]] = {}
+    for (anchor, other), shared in pairs.items():
+        if anchor == other:
+            continue
+        score = shared / math.sqrt(counts.get(anchor, shared) * counts.get(other, shared))
+        candidates.setdefault(anchor, []).append((score, -other, shared))
+    return {
+        anchor: [
+            [-negated, round(score, 4), shared]
+            for score, negated, shared in heapq.nlargest(k, entries)
+        ]
+        for anchor, entries in candidates.items()
+    }
+
+
+def _favorite_rows(favorites) -> Iterable[Tuple[int, int]]:
+    return (
+        favorites.order_by("user_id", "car_id")
+        .values_list("user_id", "car_id")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _store(neighbors: Dict[int, Neighbors], car_ids: Sequence[int], started) -> None:
+    """Save the neighbours of ``car_ids`` (empty when absent from ``neighbors``)."""
+
+    with transaction.atomic():
+        RelatedCars.objects.bulk_create(
+            [RelatedCars(car_id=car_id, neighbors=neighbors.get(car_id, [])) for car_id in car_ids],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["car"],
+            update_fields=["neighbors", "updated_at"],
+        )
+        # Rows marked while this ran stay stale for the next refresh.
+        RelatedCars.objects.filter(car_id__in=car_ids, stale_since__lt=started).update(stale_since=None)
+
+
+def build(k: Optional[int] = None, partitions: int = 1) -> int:
+    """Rebuild the neighbours of every car; returns the number of cars with any."""
+
+    k = k or settings.RELATED_CARS_K
+    started = timezone.now()
+    counts = favorite_counts()
+    car_ids = list(Car.objects.order_by("id").values_list("id", flat=True))
+    related = 0
+    for part in range(partitions):
+        neighbors = _neighbors(
+            _favorite_rows(Favorite.objects.all()),
+            lambda car_id: car_id % partitions == part,
+            counts,
+            k,
+        )
+        related += len(neighbors)
+        _store(neighbors, [car_id for car_id in car_ids if car_id % partitions == part], started)
+    return related
+
+
+def refresh(k: Optional[int] = None) -> int:
+    """Rebuild the stale rows and the favourited cars without a row; returns how many."""
+
+    k = k or settings.RELATED_CARS_K
+    started = timezone.now()
+    pending = list(
+        Car.objects.filter(
+            Q(related_cars__stale_since__isnull=False)
+            | Q(related_cars__isnull=True, favorites__isnull=False)
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    if not pending:
+        return 0
+    counts = favorite_counts()
+    for start in range(0, len(pending), REFRESH_BATCH):
+        anchors = pending[start:start + REFRESH_BATCH]
+        users = Favorite.objects.filter(car_id__in=anchors).values("user_id")
+        neighbors = _neighbors(
+            _favorite_rows(Favorite.objects.filter(user_id__in=users)),
+            set(anchors).__contains__,
+            counts,
+            k,
+        )
+        _store(neighbors, anchors, started)
+    return len(pending)
+
+
+def mark_stale(user_id: int, car_ids: Iterable[int]) -> None:
+    """Flag the cars whose neighbours a favourite change of ``user_id`` affects.
+
+    Those are the changed cars and every other car the user favourited.
+    """
+
+    RelatedCars.objects.filter(
+        Q(car_id__in=list(car_ids)) | Q(car_id__in=Favorite.objects.filter(user_id=user_id).values("car_id")),
+        stale_since__isnull=True,
+    ).update(stale_since=timezone.now())
+
+
+def neighbors(car_id: int) -> Optional[Neighbors]:
+    """Stored neighbours of ``car_id``; ``None`` when none were built for it."""
+
+    return RelatedCars.objects.filter(car_id=car_id).values_list("neighbors", flat=True).first()
@@ -1,15 +1,160 @@
 # Uncomment the imports below before you add the function code
-import requests
+import copy
+import hashlib
+import logging
 import os
-from dotenv import load_dotenv
+import threading
+import time
 
-load_dotenv()
+from django.conf import settings
+from django.core.cache import cache
 
-backend_url = os.getenv(
-    'backend_url', default="http://localhost:3030")
-sentiment_analyzer_url = os.getenv(
-    'sentiment_analyzer_url',
-    default="http://localhost:5050/")
+from .instrumentation import track_upstream
+
+logger = logging.getLogger(__name__)
+
+# ``backend_url`` and ``sentiment_analyzer_url`` are read from the environment
+# (and ``.env``) on first use rather than at import time; see ``_config``.
+_DEFAULT_URLS = {
+    'backend_url': "http://localhost:3030",
+    'sentiment_analyzer_url': "http://localhost:5050/",
+}
+_config_lock = threading.Lock()
+_http_session = None
+
+
+def _config(name):
+    """Value of an upstream URL setting, loading ``.env`` the first time.
+
+    Assigning the module attribute (as the benchmarks do) overrides it.
+    """
+    value = globals().get(name)
+    if value is None:
+        with _config_lock:
+            value = globals().get(name)
+            if value is None:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                value = os.getenv(name, default=_DEFAULT_URLS[name])
+                globals()[name] = value
+    return value
+
+
+def __getattr__(name):
+    if name in _DEFAULT_URLS:
+        return _config(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _timeout():
+    """Seconds an upstream call, or a wait for a coalesced one, may take."""
+    return getattr(settings, "UPSTREAM_TIMEOUT", 10.0)
+
+
+def _session():
+    """Shared ``requests`` session, created (and ``requests`` imported) on first use.
+
+    Reusing it keeps upstream connections alive between calls.
+    """
+    global _http_session
+    if _http_session is None:
+        with _config_lock:
+            if _http_session is None:
+                import requests
+
+                _http_session = requests.Session()
+    return _http_session
+
+
+class _Call:
+    """An upstream call in flight that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """Share one in-flight upstream call between identical concurrent requests.
+
+    Within a process, callers asking for a key that is already being fetched
+    wait for the first caller (the leader) and receive a copy of its result;
+    after ``UPSTREAM_TIMEOUT`` seconds they stop waiting and fetch themselves.
+    With ``UPSTREAM_COALESCE_ACROSS_PROCESSES`` enabled the leader also takes
+    a lock in the Django cache and publishes its result there for
+    ``UPSTREAM_COALESCE_RESULT_TTL`` seconds, so workers in other processes
+    sharing that cache wait for it instead of calling the backend again.
+    """
+
+    poll_interval = 0.02
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fetch):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(_timeout()):
+                return copy.deepcopy(call.result)
+            return fetch()
+
+        result = None
+        try:
+            result = self._fetch_shared(key, fetch)
+            # Waiters copy from a private snapshot, never from the object the
+            # leader hands to its caller, which may mutate it meanwhile.
+            call.result = copy.deepcopy(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result
+
+    def _fetch_shared(self, key, fetch):
+        if not getattr(settings, "UPSTREAM_COALESCE_ACROSS_PROCESSES", False):
+            return fetch()
+
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        lock_key = f"restapis:flight:{digest}"
+        result_key = f"restapis:result:{digest}"
+        wait = getattr(settings, "UPSTREAM_COALESCE_WAIT", 5.0)
+
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached[0]
+        if cache.add(lock_key, 1, timeout=wait):
+            try:
+                result = fetch()
+                if result is not None:  # failed fetches are not shared
+                    cache.set(
+                        result_key,
+                        (result,),
+                        timeout=getattr(settings, "UPSTREAM_COALESCE_RESULT_TTL", 1.0),
+                    )
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        # Another process is fetching: wait for its result, then give up and fetch.
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            cached = cache.get(result_key)
+            if cached is not None:
+                return cached[0]
+            if cache.get(lock_key) is None:
+                break
+        return fetch()
+
+
+_single_flight = SingleFlight()
 
 # def get_request(endpoint, **kwargs):
 def get_request(endpoint, **kwargs):
@@ -18,13 +163,18 @@ def get_request(endpoint, **kwargs):
         for key,value in kwargs.items():
             params=params+key+"="+value+"&"
 
-    request_url = backend_url+endpoint+"?"+params
+    request_url = _config("backend_url")+endpoint+"?"+params
 
     print("GET from {} ".format(request_url))
+    return _single_flight.do(request_url, lambda: _get_json(request_url))
+
+
+def _get_json(request_url):
     try:
         # Call get method of requests library with URL and parameters
-        response = requests.get(request_url)
-        return response.json()
+        with track_upstream():
+            response = _session().get(request_url, timeout=_timeout())
+            return response.json()
     except:
         # If any error occurs
         print("Network exception occurred")
@@ -34,21 +184,55 @@ def get_request(endpoint, **kwargs):
 # request_url = sentiment_analyzer_url+"analyze/"+text
 
 def analyze_review_sentiments(text):
-    request_url = sentiment_analyzer_url+"analyze/"+text
+    request_url = _config("sentiment_analyzer_url")+"analyze/"+text
+    return _single_flight.do(request_url, lambda: _get_sentiment(request_url))
+
+
+def _get_sentiment(request_url):
     try:
         # Call get method of requests library with URL and parameters
-        response = requests.get(request_url)
-        return response.json()
+        with track_upstream():
+            response = _session().get(request_url, timeout=_timeout())
+            return response.json()
     except Exception as err:
         print(f"Unexpected {err=}, {type(err)=}")
         print("Network exception occurred")
 # Add code for retrieving sentiments
 
+def analyze_review_sentiments_batch(texts):
+    """Sentiments for many texts, in order, with one analyzer call when possible.
+
+    Falls back to one ``analyze/<text>`` call per text when the analyzer
+    rejects the batch request (older deployments without ``POST /analyze``).
+    When the analyzer cannot be reached at all every text comes back as
+    ``None`` rather than retrying each one; so do texts that could not be
+    scored.
+    """
+    if not texts:
+        return []
+    request_url = _config("sentiment_analyzer_url")+"analyze"
+    try:
+        with track_upstream():
+            response = _session().post(request_url,json={"texts": list(texts)},timeout=_timeout())
+        if response.ok:
+            sentiments = response.json().get("sentiments")
+            if isinstance(sentiments, list) and len(sentiments) == len(texts):
+                return sentiments
+    except Exception:
+        logger.warning("Batch sentiment analysis failed", exc_info=True)
+        return [None] * len(texts)
+    results = []
+    for text in texts:
+        response = analyze_review_sentiments(text)
+        results.append(response.get("sentiment") if response else None)
+    return results
+
 # def post_review(data_dict):
 def post_review(data_dict):
-    request_url = backend_url+"/insert_review"
+    request_url = _config("backend_url")+"/insert_review"
     try:
-        response = requests.post(request_url,json=data_dict)
+        with track_upstream():
+            response = _session().post(request_url,json=data_dict,timeout=_timeout())
         print(response.json())
         return response.json()
     except:
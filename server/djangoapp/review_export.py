@@ -0,0 +1,107 @@
+"""Streaming export of dealer reviews with their sentiment.
+
+Reviews are pulled lazily one dealer at a time from the backend, filtered,
+and scored by the sentiment analyzer in fixed-size batches, so memory use
+depends on the batch size rather than on the number of reviews exported.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .restapis import analyze_review_sentiments_batch, get_request
+
+FIELDS = [
+    "id",
+    "dealership",
+    "name",
+    "review",
+    "purchase",
+    "purchase_date",
+    "car_make",
+    "car_model",
+    "car_year",
+    "sentiment",
+]
+
+
+def parse_review_date(value: Optional[str]) -> Optional[date]:
+    """Parse ``MM/DD/YYYY`` (backend format) or ISO ``YYYY-MM-DD`` dates."""
+
+    if not value:
+        return None
+    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def iter_reviews(
+    dealer_ids: Iterable[int],
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> Iterator[dict]:
+    """Yield reviews dealer by dealer, keeping only those in the date range."""
+
+    for dealer_id in dealer_ids:
+        reviews = get_request(f"/fetchReviews/dealer/{dealer_id}")
+        if not isinstance(reviews, list):
+            continue
+        for review in reviews:
+            if since or until:
+                purchased = parse_review_date(review.get("purchase_date"))
+                if purchased is None:
+                    continue
+                if since and purchased < since:
+                    continue
+                if until and purchased > until:
+                    continue
+            yield review
+
+
+def with_sentiment(reviews: Iterable[dict], batch_size: int) -> Iterator[Dict[str, object]]:
+    """Attach a ``sentiment`` to each review, scoring ``batch_size`` at a time.
+
+    The sentiment is ``None`` for reviews the analyzer could not score.
+    """
+
+    batch: List[dict] = []
+
+    def flush() -> Iterator[Dict[str, object]]:
+        sentiments = analyze_review_sentiments_batch([review.get("review", "") for review in batch])
+        for review, sentiment in zip(batch, sentiments):
+            row = {field: review.get(field) for field in FIELDS}
+            row["sentiment"] = sentiment
+            yield row
+        batch.clear()
+
+    for review in reviews:
+        batch.append(review)
+        if len(batch) >= batch_size:
+            yield from flush()
+    if batch:
+        yield from flush()
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_jsonl(rows: Iterable[Dict[str, object]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def render_csv(rows: Iterable[Dict[str, object]]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,189 @@
+"""Per-dealer review aggregates backed by :class:`DealerReviewSummary`.
+
+Summaries are updated incrementally when ``add_review`` posts a review and
+can be rebuilt in bulk from the backend, so reading one costs a single
+indexed query instead of downloading and scoring every review.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.db import connections, transaction
+
+from .models import DealerReviewSummary
+from .restapis import analyze_review_sentiments, get_request
+from .review_export import parse_review_date, with_sentiment
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("positive", "neutral", "negative")
+TREND_MONTHS = 6
+SUMMARY_FIELDS = ["total", *SENTIMENTS, "purchases", "by_make", "by_year", "by_month"]
+
+
+def _is_purchase(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def apply_review(summary: DealerReviewSummary, review: dict, sentiment: Optional[str]) -> None:
+    """Add one review to ``summary`` in memory (the caller saves it)."""
+
+    sentiment = sentiment if sentiment in SENTIMENTS else "neutral"
+    summary.total += 1
+    setattr(summary, sentiment, getattr(summary, sentiment) + 1)
+    if _is_purchase(review.get("purchase")):
+        summary.purchases += 1
+
+    make = review.get("car_make")
+    if make:
+        summary.by_make[str(make)] = summary.by_make.get(str(make), 0) + 1
+    year = review.get("car_year")
+    if year:
+        summary.by_year[str(year)] = summary.by_year.get(str(year), 0) + 1
+
+    purchased = parse_review_date(review.get("purchase_date"))
+    if purchased:
+        month = summary.by_month.setdefault(
+            purchased.strftime("%Y-%m"), {"total": 0, **{name: 0 for name in SENTIMENTS}}
+        )
+        month["total"] += 1
+        month[sentiment] += 1
+
+
+def _fetch_dealer_reviews(dealer_id: int) -> Optional[List[dict]]:
+    reviews = get_request(f"/fetchReviews/dealer/{dealer_id}")
+    return reviews if isinstance(reviews, list) else None
+
+
+def rebuild(dealer_ids: Iterable[int], batch_size: int = 100) -> List[int]:
+    """Recompute the summaries of ``dealer_ids`` from the backend.
+
+    Dealers whose reviews cannot be fetched keep their current summary.
+    Returns the ids that were rebuilt.
+    """
+
+    summaries: List[DealerReviewSummary] = []
+    for dealer_id in dealer_ids:
+        reviews = _fetch_dealer_reviews(dealer_id)
+        if reviews is None:
+            logger.warning("Skipping review summary for dealer %s: backend unavailable", dealer_id)
+            continue
+        summary = DealerReviewSummary(dealer_id=dealer_id, by_make={}, by_year={}, by_month={})
+        for row in with_sentiment(reviews, batch_size):
+            apply_review(summary, row, row["sentiment"])
+        summaries.append(summary)
+
+    DealerReviewSummary.objects.bulk_create(
+        summaries,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["dealer_id"],
+        update_fields=SUMMARY_FIELDS + ["updated_at"],
+    )
+    return [summary.dealer_id for summary in summaries]
+
+
+def record_review(review: dict, sentiment: Optional[str]) -> None:
+    """Fold a newly posted review into its dealer's summary.
+
+    A dealer without a summary yet is rebuilt from the backend instead, as
+    an incremental update would only count the new review.
+    """
+
+    try:
+        dealer_id = int(review.get("dealership"))
+    except (TypeError, ValueError):
+        return
+
+    with transaction.atomic():
+        summary = DealerReviewSummary.objects.select_for_update().filter(dealer_id=dealer_id).first()
+        if summary is not None:
+            apply_review(summary, review, sentiment)
+            summary.save()
+            return
+    rebuild([dealer_id])
+
+
+def record_review_later(review: dict) -> None:
+    """Score and record a posted review in a background thread.
+
+    The thread starts once the current transaction commits, so the request
+    does not wait for the sentiment analyzer.
+    """
+
+    def run():
+        try:
+            response = analyze_review_sentiments(review.get("review") or "")
+            record_review(review, response.get("sentiment") if response else None)
+        except Exception:
+            logger.exception("Recording a review of dealer %s failed", review.get("dealership"))
+        finally:
+            connections.close_all()
+
+    transaction.on_commit(lambda: threading.Thread(target=run, name="review-summary", daemon=True).start())
+
+
+_rebuilding: Set[int] = set()
+_rebuilding_lock = threading.Lock()
+
+
+def rebuild_later(dealer_id: int) -> None:
+    """Rebuild one dealer's summary in a background thread, once the transaction commits.
+
+    Does nothing while a rebuild of that dealer is already queued or running.
+    """
+
+    with _rebuilding_lock:
+        if dealer_id in _rebuilding:
+            return
+        _rebuilding.add(dealer_id)
+
+    def run():
+        try:
+            rebuild([dealer_id])
+        except Exception:
+            logger.exception("Rebuilding the review summary of dealer %s failed", dealer_id)
+        finally:
+            with _rebuilding_lock:
+                _rebuilding.discard(dealer_id)
+            connections.close_all()
+
+    transaction.on_commit(lambda: threading.Thread(target=run, name="review-summary", daemon=True).start())
+
+
+def get_summary(dealer_id: int) -> Optional[DealerReviewSummary]:
+    """Stored summary for a dealer; ``None`` if there is none yet.
+
+    A missing summary is queued for a background rebuild (:func:`rebuild_later`)
+    rather than built inside the request.
+    """
+
+    summary = DealerReviewSummary.objects.filter(dealer_id=dealer_id).first()
+    if summary is None:
+        rebuild_later(dealer_id)
+    return summary
+
+
+def summary_payload(summary: DealerReviewSummary) -> Dict[str, object]:
+    total = summary.total
+
+    def ratio(count: int) -> float:
+        return round(count / total, 4) if total else 0.0
+
+    months = sorted(summary.by_month)[-TREND_MONTHS:]
+    return {
+        "dealer_id": summary.dealer_id,
+        "total": total,
+        "sentiment": {name: getattr(summary, name) for name in SENTIMENTS},
+        "sentiment_ratio": {name: ratio(getattr(summary, name)) for name in SENTIMENTS},
+        "purchase_ratio": ratio(summary.purchases),
+        "by_make": summary.by_make,
+        "by_year": summary.by_year,
+        "trend": [{"month": month, **summary.by_month[month]} for month in months],
+        "updated_at": summary.updated_at.isoformat() if summary.updated_at else None,
+    }
@@ -0,0 +1,82 @@
+"""Database routing between the primary and an optional read replica."""
+
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+from django.conf import settings
+
+REPLICA = "replica"
+PRIMARY = "default"
+
+_read_from_replica: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "djangoapp_read_from_replica", default=False
+)
+# Aliases written to during the current request, while tracked.
+_written: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar(
+    "djangoapp_written", default=None
+)
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def begin_replica_reads() -> contextvars.Token:
+    """Send subsequent reads to the replica, if one is configured."""
+
+    return _read_from_replica.set(replica_configured())
+
+
+def end_replica_reads(token: contextvars.Token) -> None:
+    _read_from_replica.reset(token)
+
+
+def begin_write_tracking() -> contextvars.Token:
+    """Start noting the databases the router sends writes to."""
+
+    return _written.set(set())
+
+
+def end_write_tracking(token: contextvars.Token) -> bool:
+    """Stop tracking; returns whether anything was routed for writing meanwhile."""
+
+    written = bool(_written.get())
+    _written.reset(token)
+    return written
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Send the reads made inside the block to the replica, if one is configured."""
+
+    token = begin_replica_reads()
+    try:
+        yield
+    finally:
+        end_replica_reads(token)
+
+
+class PrimaryReplicaRouter:
+    """Route reads to the replica only while replica reads are switched on.
+
+    Everything else, including all writes and migrations, uses the primary,
+    so code that is not explicitly marked read-only never sees replica lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if _read_from_replica.get() else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        written = _written.get()
+        if written is not None:
+            written.add(PRIMARY)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,84 @@
+"""Signal handlers for the djangoapp models."""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalogue, recommendations, similarity, trending
+from .models import Car, CarMake, Comment, CommentLike, Favorite
+
+
+@receiver(post_save, sender=Car)
+def queue_car_images(sender, instance: Car, raw: bool = False, **kwargs) -> None:
+    """Build image variants in the background when a car's image changes."""
+
+    if raw or not settings.CAR_IMAGE_WORKER or not instance.image_url:
+        return
+    if (instance.image_variants or {}).get("source") == instance.image_url:
+        return
+
+    from .images import worker
+
+    transaction.on_commit(lambda: worker.enqueue([instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=Car)
+@receiver([post_save, post_delete], sender=CarMake)
+def bump_catalogue_version(sender, raw: bool = False, **kwargs) -> None:
+    """Invalidate the in-memory catalogue snapshots after a catalogue write."""
+
+    if raw or settings.CATALOGUE_ENGINE != "memory":
+        return
+    transaction.on_commit(catalogue.bump_version)
+
+
+@receiver([post_save, post_delete], sender=Car)
+def bump_similarity_version(sender, raw: bool = False, **kwargs) -> None:
+    """Invalidate the similar-cars indexes after a car write."""
+
+    if raw:
+        return
+    transaction.on_commit(similarity.bump_version)
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+@receiver([post_save, post_delete], sender=Comment)
+def adjust_catalogue_counts(sender, instance, raw: bool = False, created: bool = True, **kwargs) -> None:
+    """Count a new or removed favourite or comment in this worker's catalogue overlay."""
+
+    if raw or not created or settings.CATALOGUE_ENGINE != "memory":
+        return
+    kind = "favorite" if sender is Favorite else "comment"
+    delta = -1 if kwargs["signal"] is post_delete else 1
+    car_id = instance.car_id
+    transaction.on_commit(lambda: catalogue.engine.adjust_count(kind, car_id, delta))
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+def mark_related_cars_stale(sender, instance: Favorite, raw: bool = False, **kwargs) -> None:
+    """Queue the neighbours this favourite change affects for the next refresh."""
+
+    if raw:
+        return
+    user_id, car_id = instance.user_id, instance.car_id
+    transaction.on_commit(lambda: recommendations.mark_stale(user_id, [car_id]))
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=CommentLike)
+def record_trending_event(sender, instance, raw: bool = False, created: bool = True, **kwargs) -> None:
+    """Add a new favourite, comment or like to its car's trending score, or take it back."""
+
+    if raw or not created:
+        return
+    removed = kwargs["signal"] is post_delete
+    if sender is CommentLike:
+        trending.record("like", Q(comments=instance.comment_id), instance.created_at, removed)
+    else:
+        kind = "favorite" if sender is Favorite else "comment"
+        trending.record(kind, Q(pk=instance.car_id), instance.created_at, removed)
@@ -0,0 +1,124 @@
+"""Nearest cars by price, year and body type.
+
+Each car becomes a point: log price and year scaled to ``0..1`` over the
+catalogue, plus a fixed ``TYPE_DISTANCE`` between cars of different body
+types.  Points are kept sorted by the price coordinate (overall and per
+make), so a query walks outwards from the car's position in that order and
+stops once the price gap alone exceeds the k-th best distance found; the
+result is exact and usually touches a handful of neighbours in price.
+
+:func:`index` keeps one index per worker, built from a single ``values_list``
+query.  It has its own version in the cache (:func:`bump_version`), bumped
+by car writes only, so favourites and comments never rebuild it; whatever
+the catalogue engine, ``CATALOGUE_SNAPSHOT_MAX_AGE`` bounds its staleness.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from . import catalogue
+from .models import Car
+
+VERSION_KEY = "similarity:version"
+
+# Distance added between cars of different body types, in the units of the
+# scaled price and year (a full catalogue range is 1).
+TYPE_DISTANCE = 0.5
+
+
+def _scaler(values: Sequence[float]):
+    low, high = min(values, default=0.0), max(values, default=0.0)
+    span = high - low
+    return (lambda value: (value - low) / span) if span else (lambda value: 0.0)
+
+
+class _Ordering:
+    """Rows sorted by their price coordinate."""
+
+    def __init__(self, rows: List[int], prices: array) -> None:
+        self.rows = array("I", sorted(rows, key=lambda row: (prices[row], row)))
+        self.prices = array("d", (prices[row] for row in self.rows))
+
+
+class SimilarityIndex:
+    """Exact k-nearest-neighbour search over ``(id, price, year, type, make)`` rows."""
+
+    def __init__(self, cars: Sequence[Tuple[int, float, int, str, int]]) -> None:
+        self.ids = array("q", (car[0] for car in cars))
+        self.rows: Dict[int, int] = {car_id: row for row, car_id in enumerate(self.ids)}
+        log_price = [math.log(max(float(car[1]), 1.0)) for car in cars]
+        scale_price, scale_year = _scaler(log_price), _scaler([car[2] for car in cars])
+        self.prices = array("d", map(scale_price, log_price))
+        self.years = array("d", (scale_year(car[2]) for car in cars))
+        self.types = [car[3].lower() for car in cars]
+        self.makes = array("q", (car[4] for car in cars))
+
+        self.orderings: Dict[Optional[int], _Ordering] = {None: _Ordering(list(range(len(cars))), self.prices)}
+        by_make: Dict[int, List[int]] = {}
+        for row, make in enumerate(self.makes):
+            by_make.setdefault(make, []).append(row)
+        for make, rows in by_make.items():
+            self.orderings[make] = _Ordering(rows, self.prices)
+
+    def distance(self, a: int, b: int) -> float:
+        squared = (self.prices[a] - self.prices[b]) ** 2 + (self.years[a] - self.years[b]) ** 2
+        if self.types[a] != self.types[b]:
+            squared += TYPE_DISTANCE ** 2
+        return math.sqrt(squared)
+
+    def similar(self, car_id: int, k: int = 5, same_make: bool = False) -> Optional[List[Tuple[float, int]]]:
+        """Up to ``k`` ``(distance, car_id)`` closest to ``car_id``, closest first.
+
+        ``None`` when ``car_id`` is not in the index.
+        """
+
+        row = self.rows.get(car_id)
+        if row is None:
+            return None
+        ordering = self.orderings[self.makes[row] if same_make else None]
+        price = self.prices[row]
+        best: List[Tuple[float, int]] = []  # max-heap as (-distance, -row)
+        right = bisect_left(ordering.prices, price)
+        left = right - 1
+        size = len(ordering.rows)
+        while left >= 0 or right < size:
+            gap_left = price - ordering.prices[left] if left >= 0 else math.inf
+            gap_right = ordering.prices[right] - price if right < size else math.inf
+            if len(best) == k and min(gap_left, gap_right) > -best[0][0]:
+                break
+            if gap_left <= gap_right:
+                other, left = ordering.rows[left], left - 1
+            else:
+                other, right = ordering.rows[right], right + 1
+            if other == row:
+                continue
+            entry = (-self.distance(row, other), -other)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        return [(-distance, self.ids[-other]) for distance, other in sorted(best, reverse=True)]
+
+
+def _build() -> SimilarityIndex:
+    return SimilarityIndex(list(Car.objects.values_list("id", "price", "year", "car_type", "make_id")))
+
+
+_index = catalogue.VersionedValue(_build, lambda: settings.CATALOGUE_SNAPSHOT_MAX_AGE, VERSION_KEY)
+
+
+def index() -> SimilarityIndex:
+    """This worker's index, rebuilt first if the cars changed."""
+
+    return _index.get()
+
+
+def bump_version() -> None:
+    catalogue.bump_version(VERSION_KEY)
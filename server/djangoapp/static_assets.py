@@ -0,0 +1,148 @@
+"""Hashed, precompressed static files and a view that serves them.
+
+``CompressedManifestStaticFilesStorage`` is ``ManifestStaticFilesStorage``
+(content-hashed copies of every file plus ``staticfiles.json``) that also
+writes ``.gz`` and, when the optional ``brotli`` package is installed,
+``.br`` siblings of text assets during ``collectstatic``.  :func:`serve`
+picks the best precompressed sibling for the client's ``Accept-Encoding``
+and marks hashed files as cacheable forever, since their content can never
+change under the same name.
+"""
+
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.views import serve as finders_serve
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml", ".ico",
+}
+# Compressed siblings must save at least this fraction to be kept.
+MIN_SAVING = 0.05
+# Django's manifest hash (12 hex) or the hash create-react-app puts in bundle names (8 hex).
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,12}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also stores gzip/brotli copies of text assets."""
+
+    def post_process(self, paths, dry_run=False, **options) -> Iterator[Tuple[str, str, bool]]:
+        names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if isinstance(processed, Exception):
+                continue
+            names.add(name)
+            if hashed_name:
+                names.add(hashed_name)
+        if dry_run:
+            return
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                self.compress(name)
+
+    def compress(self, name: str) -> None:
+        with self.open(name) as handle:
+            content = handle.read()
+        brotli = _brotli()
+        encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(content)
+            if len(compressed) > len(content) * (1 - MIN_SAVING):
+                continue
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
+
+
+def cache_control_for(path: str) -> str:
+    if HASHED_NAME.search(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={settings.STATIC_MAX_AGE}"
+
+
+def _accepted_encodings(request) -> set:
+    accepted = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _select_file(request, fullpath: str) -> Tuple[str, Optional[str]]:
+    """Return the file to send for ``fullpath`` and its content encoding."""
+
+    accepted = _accepted_encodings(request)
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            return fullpath + suffix, encoding
+    return fullpath, None
+
+
+def serve(request, path: str):
+    """Serve ``path`` from ``STATIC_ROOT`` with compression and cache headers.
+
+    Files missing from ``STATIC_ROOT`` (``collectstatic`` not run yet) are
+    looked up through the staticfiles finders when ``DEBUG`` is on.
+    """
+
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid static path.")
+    if not os.path.isfile(fullpath):
+        if settings.DEBUG:
+            return finders_serve(request, path, insecure=True)
+        raise Http404("Static file not found.")
+
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        filename, encoding = _select_file(request, fullpath)
+        content_type, _ = mimetypes.guess_type(fullpath)
+        response = FileResponse(
+            open(filename, "rb"),
+            content_type=content_type or "application/octet-stream",
+            filename=os.path.basename(fullpath),
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control_for(path)
+    response["Vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,712 @@
+import random
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import car_views, catalogue, trending
+from .dealers import DealerDirectory
+from .geo import GridIndex, haversine_km
+from .inventory import CATEGORICAL, NUMERIC, Inventory, InventoryIndex
+from .models import Car, CarViewCount, Comment, CommentLike, Favorite
+from .restapis import SingleFlight
+from .similarity import SimilarityIndex
+from .views import CAR_BATCH_MAX_IDS, _ensure_catalogue, _insert_new, _price_buckets
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll ``predicate`` until it holds; returns its last value."""
+
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+DEALERS = [
+    {"id": 1, "state": "Texas", "lat": "30.2", "long": "-97.7"},
+    {"id": 2, "state": "Kansas", "lat": "39.1", "long": "-94.6"},
+    {"id": "3", "state": "Texas", "lat": "29.7", "long": "-95.3"},
+]
+
+
+class DealerDirectoryTests(SimpleTestCase):
+    def loader(self, *results):
+        """A loader returning ``results`` in turn (the last one repeatedly), counting calls."""
+
+        self.calls = 0
+        self.called = threading.Event()
+
+        def load():
+            self.calls += 1
+            result = results[min(self.calls, len(results)) - 1]
+            self.called.set()
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return load
+
+    def test_first_load_indexes_dealers(self):
+        directory = DealerDirectory(loader=self.loader(DEALERS), ttl=300)
+        snapshot = directory.snapshot()
+        self.assertEqual(sorted(snapshot.by_id), [1, 2, 3])
+        self.assertEqual([dealer["id"] for dealer in snapshot.by_state["Texas"]], [1, "3"])
+        self.assertIs(directory.snapshot(), snapshot)
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_first_load_backs_off(self):
+        directory = DealerDirectory(loader=self.loader(None, DEALERS), ttl=300, retry_after=60)
+        self.assertIsNone(directory.snapshot())
+        self.assertIsNone(directory.snapshot())
+        self.assertEqual(self.calls, 1)
+
+    def test_loader_exception_is_treated_as_failure(self):
+        directory = DealerDirectory(loader=self.loader(RuntimeError("down")), ttl=300)
+        with self.assertLogs("djangoapp.dealers", "ERROR"):
+            self.assertIsNone(directory.snapshot())
+
+    def test_failed_refresh_keeps_stale_copy(self):
+        directory = DealerDirectory(loader=self.loader(DEALERS, None), ttl=300, retry_after=60)
+        snapshot = directory.snapshot()
+        self.assertFalse(directory.refresh())
+        self.assertIs(directory.snapshot(), snapshot)
+
+    def test_stale_copy_served_while_refreshing_in_background(self):
+        directory = DealerDirectory(loader=self.loader(DEALERS, DEALERS[:1]), ttl=0)
+        snapshot = directory.snapshot()
+        self.assertIs(directory.snapshot(), snapshot)  # stale, refresh started
+        self.assertTrue(wait_until(lambda: directory._snapshot is not snapshot))
+        self.assertEqual(list(directory.snapshot().by_id), [1])
+
+    def test_failed_background_refresh_backs_off(self):
+        directory = DealerDirectory(loader=self.loader(DEALERS, None), ttl=0, retry_after=60)
+        snapshot = directory.snapshot()
+        self.called.clear()
+        directory.snapshot()
+        self.assertTrue(self.called.wait(5))
+        self.assertTrue(wait_until(lambda: not directory._refreshing))
+        self.assertIs(directory.snapshot(), snapshot)
+        self.assertEqual(self.calls, 2)
+
+
+class GridIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(41)
+        # Mostly the continental US, plus points near the poles and the antimeridian.
+        self.points = [(rng.uniform(25, 49), rng.uniform(-125, -67), index) for index in range(400)]
+        self.points += [(rng.uniform(70, 89.9), rng.uniform(-180, 180), index) for index in range(400, 440)]
+        self.points += [
+            (rng.uniform(-60, 60), rng.choice([-1, 1]) * rng.uniform(175, 180), index) for index in range(440, 480)
+        ]
+        self.index = GridIndex(self.points)
+        self.queries = [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(60)]
+        self.queries += [(rng.uniform(25, 49), rng.uniform(-125, -67)) for _ in range(60)]
+        self.queries += [(0.0, 179.9), (0.0, -179.9), (89.9, 0.0), (-89.9, 0.0)]
+
+    def brute_force(self, points, lat, lon, k, max_km=None):
+        distances = sorted((haversine_km(lat, lon, p_lat, p_lon), item) for p_lat, p_lon, item in points)
+        return [(distance, item) for distance, item in distances if max_km is None or distance <= max_km][:k]
+
+    def assertSameResult(self, result, expected):
+        self.assertEqual([item for _, item in result], [item for _, item in expected])
+        for (distance, _), (expected_distance, _) in zip(result, expected):
+            self.assertAlmostEqual(distance, expected_distance, places=6)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in self.queries:
+            for k in (1, 5, 25):
+                self.assertSameResult(self.index.nearest(lat, lon, k), self.brute_force(self.points, lat, lon, k))
+
+    def test_nearest_within_max_km_matches_brute_force(self):
+        for lat, lon in self.queries:
+            for max_km in (50, 500, 3000):
+                self.assertSameResult(
+                    self.index.nearest(lat, lon, 10, max_km=max_km),
+                    self.brute_force(self.points, lat, lon, 10, max_km),
+                )
+
+    def test_within_matches_brute_force(self):
+        for lat, lon in self.queries[:30]:
+            self.assertSameResult(
+                self.index.within(lat, lon, 1000),
+                self.brute_force(self.points, lat, lon, len(self.points), 1000),
+            )
+
+    def test_small_index_scans_every_point(self):
+        points = self.points[:50]
+        index = GridIndex(points)
+        for lat, lon in self.queries:
+            self.assertSameResult(index.nearest(lat, lon, 3), self.brute_force(points, lat, lon, 3))
+
+    def test_empty_index_and_non_positive_k(self):
+        self.assertEqual(GridIndex([]).nearest(30, -97), [])
+        self.assertEqual(self.index.nearest(30, -97, k=0), [])
+
+
+class InventoryIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        models = {"Toyota": ["Corolla", "RAV4"], "Ford": ["F-150", "Focus"], "Kia": ["Soul"]}
+        self.records = []
+        for _ in range(1000):
+            make = rng.choice(list(models))
+            self.records.append(
+                {
+                    "dealer_id": rng.randrange(1, 30),
+                    "make": make,
+                    "model": rng.choice(models[make]),
+                    "bodyType": rng.choice(["SUV", "Sedan", "Pickup"]),
+                    "year": rng.randrange(2010, 2024),
+                    "mileage": rng.randrange(0, 200000),
+                }
+            )
+        # A small block size exercises both the prefix bitmaps and the sorted slices.
+        self.index = InventoryIndex(self.records, block=16)
+        self.queries = [
+            ({}, {}),
+            ({"make": ["Ford"]}, {}),
+            ({"make": ["Ford", "Kia"], "body_type": ["SUV"]}, {}),
+            ({"dealer_id": [3, 7]}, {"year": (2015, 2018)}),
+            ({}, {"mileage": (None, 50000)}),
+            ({}, {"mileage": (150000, None), "year": (2020, 2020)}),
+            ({"model": ["Soul"]}, {"year": (2012, None), "mileage": (10000, 90000)}),
+            ({"make": ["Tesla"]}, {}),
+            ({}, {"year": (2030, None)}),
+        ]
+
+    def brute_force(self, equals, ranges):
+        rows = []
+        for row, record in enumerate(self.records):
+            if any(record[CATEGORICAL[name]] not in values for name, values in equals.items()):
+                continue
+            if any(
+                (low is not None and record[NUMERIC[name]] < low) or (high is not None and record[NUMERIC[name]] > high)
+                for name, (low, high) in ranges.items()
+            ):
+                continue
+            rows.append(row)
+        return rows
+
+    def test_match_counts_match_brute_force(self):
+        for equals, ranges in self.queries:
+            self.assertEqual(self.index.match(equals, ranges).bit_count(), len(self.brute_force(equals, ranges)))
+
+    def test_facets_match_brute_force(self):
+        for equals, ranges in self.queries:
+            matching = [self.records[row] for row in self.brute_force(equals, ranges)]
+            facets = self.index.facets(self.index.match(equals, ranges))
+            for name in ("make", "body_type"):
+                expected = {}
+                for record in matching:
+                    expected[record[CATEGORICAL[name]]] = expected.get(record[CATEGORICAL[name]], 0) + 1
+                self.assertEqual(facets[name], expected)
+
+    def test_rows_decode_matching_records_in_order(self):
+        equals, ranges = self.queries[3]
+        expected = [self.records[row] for row in self.brute_force(equals, ranges)]
+        rows = self.index.rows(self.index.match(equals, ranges), offset=2, limit=5)
+        self.assertEqual(
+            rows,
+            [
+                {name: record[field] for name, field in {**CATEGORICAL, **NUMERIC}.items()}
+                for record in expected[2:7]
+            ],
+        )
+
+    def test_dealer_counts(self):
+        expected = {}
+        for record in self.records:
+            expected[record["dealer_id"]] = expected.get(record["dealer_id"], 0) + 1
+        self.assertEqual(self.index.dealer_counts, expected)
+
+    def test_loader_failure_leaves_inventory_unavailable(self):
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError("bad records")
+
+        inventory = Inventory(loader=fail, retry_after=60)
+        with self.assertLogs("djangoapp.inventory", "ERROR"):
+            self.assertIsNone(inventory.index())
+        self.assertIsNone(inventory.index())
+        self.assertEqual(len(calls), 1)  # backing off, not retried per request
+
+
+class CarFacetTests(TestCase):
+    QUERIES = [
+        {},
+        {"brand": "Porsche"},
+        {"type": "suv"},
+        {"search": "a", "year_min": "2020"},
+        {"price_min": "100000", "price_max": "400000"},
+        {"brand": "Ferrari", "year_max": "2022", "type": "coupe"},
+        {"search": "no such car"},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        _ensure_catalogue()
+
+    def setUp(self):
+        catalogue.engine.invalidate()
+        self.cars = list(Car.objects.select_related("make"))
+
+    def keep(self, car, params, skip=None):
+        """Whether ``car`` passes every filter in ``params`` except ``skip``."""
+
+        search = params.get("search", "").lower()
+        checks = {
+            "search": not search or search in car.name.lower() or search in car.make.name.lower(),
+            "brand": "brand" not in params or car.make.name.lower() == params["brand"].lower(),
+            "type": "type" not in params or car.car_type.lower() == params["type"].lower(),
+            "price": Decimal(params.get("price_min", "-1")) <= car.price <= Decimal(params.get("price_max", "1e12")),
+            "year": int(params.get("year_min", 0)) <= car.year <= int(params.get("year_max", 9999)),
+        }
+        return all(passed for name, passed in checks.items() if name != skip)
+
+    def brute_force(self, params):
+        def counts(skip, key):
+            result = {}
+            for car in self.cars:
+                if self.keep(car, params, skip):
+                    result[key(car)] = result.get(key(car), 0) + 1
+            return result
+
+        brands, years, types = (
+            counts("brand", lambda car: car.make.name),
+            counts("year", lambda car: car.year),
+            counts("type", lambda car: car.car_type),
+        )
+        prices = [car.price for car in self.cars if self.keep(car, params, "price")]
+        buckets = _price_buckets(min(car.price for car in self.cars), max(car.price for car in self.cars))
+        return {
+            "ids": sorted(car.id for car in self.cars if self.keep(car, params)),
+            "brands": {name: brands.get(name, 0) for name in sorted({car.make.name for car in self.cars})},
+            "years": {year: years.get(year, 0) for year in sorted({car.year for car in self.cars}, reverse=True)},
+            "types": {code: types.get(code, 0) for code, _ in Car.CAR_TYPES},
+            "price": [
+                sum(low <= price and (price < high or index == len(buckets) - 1 and price <= high) for price in prices)
+                for index, (low, high) in enumerate(buckets)
+            ],
+        }
+
+    def fetch(self, params):
+        response = self.client.get("/djangoapp/api/cars/", params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        facets = data["facets"]
+        return {
+            "ids": sorted(car["id"] for car in data["cars"]),
+            "brands": {entry["value"]: entry["count"] for entry in facets["brands"]},
+            "years": {entry["value"]: entry["count"] for entry in facets["years"]},
+            "types": {entry["value"]: entry["count"] for entry in facets["types"]},
+            "price": [entry["count"] for entry in facets["price"]],
+        }
+
+    def test_sql_facets_match_brute_force(self):
+        for params in self.QUERIES:
+            with self.subTest(params=params):
+                self.assertEqual(self.fetch(params), self.brute_force(params))
+
+    @override_settings(CATALOGUE_ENGINE="memory")
+    def test_memory_facets_match_brute_force(self):
+        for params in self.QUERIES:
+            with self.subTest(params=params):
+                self.assertEqual(self.fetch(params), self.brute_force(params))
+
+
+class CarBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _ensure_catalogue()
+        cls.ids = list(Car.objects.order_by("id").values_list("id", flat=True))
+        cls.missing = cls.ids[-1] + 1000
+
+    def setUp(self):
+        catalogue.engine.invalidate()
+
+    def get(self, ids):
+        return self.client.get("/djangoapp/api/cars/", {"ids": ids})
+
+    def post(self, ids):
+        return self.client.post("/djangoapp/api/cars/batch/", {"ids": ids}, content_type="application/json")
+
+    def assertBatch(self, response, cars, missing):
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([car["id"] for car in data["cars"]], cars)
+        self.assertEqual(data["missing"], missing)
+
+    def check_order_and_missing(self):
+        first, second, third = self.ids[5], self.ids[0], self.ids[2]
+        requested = [first, self.missing, second, first, third]
+        self.assertBatch(self.get(",".join(map(str, requested))), [first, second, third], [self.missing])
+        self.assertBatch(self.post(requested), [first, second, third], [self.missing])
+
+    def test_keeps_requested_order_and_lists_missing_ids(self):
+        self.check_order_and_missing()
+
+    @override_settings(CATALOGUE_ENGINE="memory")
+    def test_memory_engine_keeps_requested_order_and_lists_missing_ids(self):
+        self.check_order_and_missing()
+
+    def test_only_missing_ids(self):
+        self.assertBatch(self.post([self.missing]), [], [self.missing])
+
+    def test_too_many_ids_rejected_before_parsing(self):
+        response = self.get(",".join(["x"] * (CAR_BATCH_MAX_IDS + 1)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(CAR_BATCH_MAX_IDS), response.json()["error"])
+
+    def test_invalid_ids(self):
+        for ids in ("", "1,abc", "0", "1,-2"):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.get(ids).status_code, 400)
+        for ids in ([], [1, True], "not a list", [1.5], None):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.post(ids).status_code, 400)
+
+    def test_batch_endpoint_only_accepts_post(self):
+        self.assertEqual(self.client.get("/djangoapp/api/cars/batch/").status_code, 405)
+
+
+class UserReactionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _ensure_catalogue()
+        User = get_user_model()
+        cls.user = User.objects.create_user("reactor", password="secret")
+        cls.other = User.objects.create_user("other", password="secret")
+        cls.car, cls.second_car = Car.objects.order_by("id")[:2]
+        cls.comment = Comment.objects.create(car=cls.car, user=cls.other, content="Nice")
+        Favorite.objects.create(user=cls.other, car=cls.car)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def react(self, *operations):
+        return self.client.post(
+            "/djangoapp/api/user/reactions/", {"operations": list(operations)}, content_type="application/json"
+        )
+
+    def test_sets_reactions_and_returns_counts(self):
+        response = self.react(
+            {"kind": "favorite", "id": self.car.id, "set": True},
+            {"kind": "like", "id": self.comment.id, "set": True},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "favorites": [{"car_id": self.car.id, "favorited": True, "favorites": 2}],
+                "likes": [{"comment_id": self.comment.id, "liked": True, "likes": 1}],
+            },
+        )
+
+    def test_replaying_a_batch_is_harmless(self):
+        operations = [
+            {"kind": "favorite", "id": self.car.id, "set": True},
+            {"kind": "like", "id": self.comment.id, "set": True},
+        ]
+        first = self.react(*operations).json()
+        self.assertEqual(self.react(*operations).json(), first)
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(CommentLike.objects.filter(user=self.user).count(), 1)
+
+    def test_last_operation_on_a_target_wins(self):
+        response = self.react(
+            {"kind": "favorite", "id": self.car.id, "set": True},
+            {"kind": "favorite", "id": self.second_car.id, "set": True},
+            {"kind": "favorite", "id": self.car.id, "set": False},
+        )
+        self.assertEqual(
+            response.json()["favorites"],
+            [
+                {"car_id": self.car.id, "favorited": False, "favorites": 1},
+                {"car_id": self.second_car.id, "favorited": True, "favorites": 1},
+            ],
+        )
+        favorites = Favorite.objects.filter(user=self.user).values_list("car_id", flat=True)
+        self.assertEqual(list(favorites), [self.second_car.id])
+
+    def test_unset_removes_only_own_reaction(self):
+        Favorite.objects.create(user=self.user, car=self.car)
+        response = self.react({"kind": "favorite", "id": self.car.id, "set": False})
+        self.assertEqual(response.json()["favorites"], [{"car_id": self.car.id, "favorited": False, "favorites": 1}])
+        self.assertTrue(Favorite.objects.filter(user=self.other, car=self.car).exists())
+
+    def test_unknown_targets_return_404_and_change_nothing(self):
+        response = self.react(
+            {"kind": "favorite", "id": self.car.id, "set": True},
+            {"kind": "favorite", "id": 999999, "set": True},
+            {"kind": "like", "id": 888888, "set": False},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["missing"], {"cars": [999999], "comments": [888888]})
+        self.assertFalse(Favorite.objects.filter(user=self.user).exists())
+
+    def test_invalid_operations(self):
+        for operation in (
+            {"kind": "bookmark", "id": self.car.id, "set": True},
+            {"kind": "favorite", "id": True, "set": True},
+            {"kind": "favorite", "id": self.car.id, "set": "yes"},
+        ):
+            with self.subTest(operation=operation):
+                self.assertEqual(self.react(operation).status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.react({"kind": "favorite", "id": self.car.id, "set": True}).status_code, 403)
+
+    def test_insert_new_returns_only_inserted_rows(self):
+        Favorite.objects.create(user=self.user, car=self.car)
+        rows = [Favorite(user=self.user, car=self.car), Favorite(user=self.user, car=self.second_car)]
+        self.assertEqual([row.car_id for row in _insert_new(Favorite, rows)], [self.second_car.id])
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 2)
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=72, TRENDING_MIN_SCORE=0.01)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _ensure_catalogue()
+        cls.user = get_user_model().objects.create_user("trender", password="secret")
+
+    def setUp(self):
+        Car.objects.update(trending_score=None)
+        self.car, self.other_car = Car.objects.order_by("id")[:2]
+        self.now = timezone.now()
+
+    def score(self, car=None):
+        stored = Car.objects.values_list("trending_score", flat=True).get(pk=(car or self.car).pk)
+        return trending.current_score(stored, self.now)
+
+    def expected(self, *events):
+        """Decayed score of ``(kind, hours_ago)`` events at ``self.now``."""
+
+        return sum(trending.WEIGHTS[kind] * 2 ** (-hours / 72) for kind, hours in events)
+
+    def record(self, kind, hours_ago, removed=False, car=None):
+        trending.record(kind, Q(pk=(car or self.car).pk), self.now - timedelta(hours=hours_ago), removed)
+
+    def test_score_is_decayed_sum_of_events(self):
+        events = [("favorite", 0), ("comment", 24), ("like", 72), ("favorite", 500)]
+        for kind, hours in events:
+            self.record(kind, hours)
+        self.assertAlmostEqual(self.score(), self.expected(*events))
+        self.assertEqual(self.score(self.other_car), 0.0)
+
+    def test_removal_takes_back_exactly_what_was_added(self):
+        self.record("favorite", 10)
+        self.record("comment", 30)
+        self.record("favorite", 10, removed=True)
+        self.assertAlmostEqual(self.score(), self.expected(("comment", 30)))
+
+    def test_removing_every_event_clears_the_score(self):
+        for kind, hours in [("like", 5), ("favorite", 48)]:
+            self.record(kind, hours)
+        for kind, hours in [("favorite", 48), ("like", 5)]:
+            self.record(kind, hours, removed=True)
+        self.assertIsNone(Car.objects.get(pk=self.car.pk).trending_score)
+
+    def test_removal_without_score_is_ignored(self):
+        self.record("favorite", 1, removed=True)
+        self.assertIsNone(Car.objects.get(pk=self.car.pk).trending_score)
+
+    def test_record_many_counts_repeats(self):
+        at = self.now - timedelta(hours=6)
+        trending.record_many("like", [self.car.pk, self.other_car.pk, self.car.pk], at)
+        self.assertAlmostEqual(self.score(), self.expected(("like", 6), ("like", 6)))
+        self.assertAlmostEqual(self.score(self.other_car), self.expected(("like", 6)))
+
+    def test_signals_match_rebuild(self):
+        Favorite.objects.create(user=self.user, car=self.car)
+        comment = Comment.objects.create(user=self.user, car=self.car, content="Nice")
+        CommentLike.objects.create(user=self.user, comment=comment)
+        Favorite.objects.create(user=self.user, car=self.other_car).delete()
+        incremental = dict(Car.objects.filter(trending_score__isnull=False).values_list("pk", "trending_score"))
+        self.assertEqual(trending.rebuild(), 1)
+        rebuilt = dict(Car.objects.filter(trending_score__isnull=False).values_list("pk", "trending_score"))
+        self.assertEqual(list(rebuilt), list(incremental))
+        self.assertAlmostEqual(rebuilt[self.car.pk], incremental[self.car.pk])
+
+    def test_compact_clears_decayed_scores(self):
+        self.record("like", 1000)
+        self.record("favorite", 1, car=self.other_car)
+        self.assertEqual(trending.compact(self.now), 1)
+        self.assertIsNone(Car.objects.get(pk=self.car.pk).trending_score)
+        self.assertIsNotNone(Car.objects.get(pk=self.other_car.pk).trending_score)
+
+
+# Keep the background flush thread idle; the tests flush explicitly.
+@override_settings(CAR_VIEW_FLUSH_SECONDS=3600, CAR_VIEW_FLUSH_EVENTS=10**6)
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _ensure_catalogue()
+        cls.car, cls.other_car = Car.objects.order_by("id")[:2]
+
+    def setUp(self):
+        self.counter = car_views.ViewCounter()
+
+    def record(self, car, times):
+        for _ in range(times):
+            self.counter.record(car.pk)
+
+    def stored(self):
+        return dict(CarViewCount.objects.values_list("car_id", "views"))
+
+    def test_flush_adds_to_stored_totals(self):
+        self.record(self.car, 3)
+        self.record(self.other_car, 1)
+        self.assertEqual(self.counter.flush(), 4)
+        self.assertEqual(self.stored(), {self.car.pk: 3, self.other_car.pk: 1})
+        self.record(self.car, 2)
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.stored(), {self.car.pk: 5, self.other_car.pk: 1})
+
+    def test_flush_without_views(self):
+        self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.stored(), {})
+
+    def test_views_of_deleted_cars_are_dropped(self):
+        self.record(self.car, 1)
+        self.counter.record(999999)
+        self.counter.flush()
+        self.assertEqual(self.stored(), {self.car.pk: 1})
+
+    def test_failed_flush_keeps_views_for_the_next_one(self):
+        self.record(self.car, 2)
+        with mock.patch.object(car_views, "_upsert", side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                self.counter.flush()
+        self.record(self.car, 1)
+        self.assertEqual(self.counter.flush(), 3)
+        self.assertEqual(self.stored(), {self.car.pk: 3})
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def blocking_fetch(self):
+        self.calls += 1
+        self.release.wait(5)
+        return {"dealers": [1, 2]}
+
+    def run_concurrently(self, count, fetch):
+        results = [None] * count
+
+        def call(position):
+            results[position] = self.flight.do("key", fetch)
+
+        threads = [threading.Thread(target=call, args=(position,)) for position in range(count)]
+        threads[0].start()
+        wait_until(lambda: self.calls == 1)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)  # let the followers reach the wait
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_concurrent_callers_share_one_fetch(self):
+        results = self.run_concurrently(5, self.blocking_fetch)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"dealers": [1, 2]}] * 5)
+
+    def test_every_caller_gets_its_own_copy(self):
+        results = self.run_concurrently(3, self.blocking_fetch)
+        results[0]["dealers"].append(3)
+        self.assertEqual(results[1], {"dealers": [1, 2]})
+        self.assertIsNot(results[1], results[2])
+
+    def test_sequential_calls_fetch_again(self):
+        self.flight.do("key", lambda: 1)
+        self.assertEqual(self.flight.do("key", lambda: 2), 2)
+
+    def test_leader_failure_releases_the_key(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.flight.do("key", fail)
+        self.assertEqual(self.flight.do("key", lambda: 3), 3)
+
+    @override_settings(UPSTREAM_TIMEOUT=0.05)
+    def test_follower_fetches_itself_after_timeout(self):
+        leader = threading.Thread(target=self.flight.do, args=("key", self.blocking_fetch))
+        leader.start()
+        wait_until(lambda: self.calls == 1)
+        try:
+            self.assertEqual(self.flight.do("key", lambda: "direct"), "direct")
+        finally:
+            self.release.set()
+            leader.join(5)
+
+    @override_settings(UPSTREAM_COALESCE_ACROSS_PROCESSES=True)
+    def test_failed_fetch_is_not_shared_across_processes(self):
+        cache.clear()
+        self.assertIsNone(self.flight.do("key", lambda: None))
+        self.assertEqual(self.flight.do("key", lambda: "fresh"), "fresh")
+        # A successful result is reused by the next caller within its TTL.
+        self.assertEqual(self.flight.do("key", lambda: "again"), "fresh")
+
+
+class SimilarityIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(48)
+        types = ["SUV", "Sedan", "Coupe", "Hatchback"]
+        self.cars = [
+            (car_id, rng.randrange(20000, 900000), rng.randrange(2010, 2025), rng.choice(types), rng.randrange(1, 6))
+            for car_id in range(1, 301)
+        ]
+        # Repeated prices and years exercise the tie-breaking.
+        self.cars += [(301, 50000, 2020, "SUV", 1), (302, 50000, 2020, "SUV", 1), (303, 50000, 2020, "suv", 2)]
+        self.index = SimilarityIndex(self.cars)
+
+    def brute_force(self, car_id, k, same_make=False):
+        row = self.index.rows[car_id]
+        candidates = [
+            (self.index.distance(row, other), self.index.ids[other])
+            for other in range(len(self.cars))
+            if other != row and (not same_make or self.index.makes[other] == self.index.makes[row])
+        ]
+        return sorted(candidates)[:k]
+
+    def assertSameNeighbours(self, result, expected):
+        self.assertEqual([car_id for _, car_id in result], [car_id for _, car_id in expected])
+        for (distance, _), (expected_distance, _) in zip(result, expected):
+            self.assertAlmostEqual(distance, expected_distance)
+
+    def test_matches_brute_force(self):
+        for car_id, *_ in self.cars:
+            for k in (1, 5, 20):
+                self.assertSameNeighbours(self.index.similar(car_id, k), self.brute_force(car_id, k))
+
+    def test_same_make_matches_brute_force(self):
+        for car_id, *_ in self.cars:
+            self.assertSameNeighbours(
+                self.index.similar(car_id, 5, same_make=True), self.brute_force(car_id, 5, same_make=True)
+            )
+
+    def test_k_larger_than_catalogue(self):
+        self.assertEqual(len(self.index.similar(1, k=1000)), len(self.cars) - 1)
+
+    def test_unknown_car(self):
+        self.assertIsNone(self.index.similar(9999))
+
+    def test_type_is_case_insensitive(self):
+        self.assertEqual(self.index.similar(301, k=2), [(0.0, 302), (0.0, 303)])
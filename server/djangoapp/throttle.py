@@ -0,0 +1,72 @@
+"""Cache-backed limiter for authentication attempts.
+
+Attempts are counted per client IP and per username in fixed windows of
+``AUTH_THROTTLE_WINDOW`` seconds.  The check runs before any password is
+hashed, so a login storm against one account or from one address is
+rejected cheaply.  Counters live in the default cache; with several workers
+it must be a shared cache for the limits to be global.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request) -> str:
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _key(scope: str, value: str) -> str:
+    digest = hashlib.sha1(value.lower().encode("utf-8")).hexdigest()
+    return f"auth-throttle:{scope}:{digest}"
+
+
+class AttemptLimiter:
+    """Fixed-window attempt counter for one kind of authentication action."""
+
+    def __init__(self, action: str, ip_limit_setting: str, username_limit_setting: Optional[str] = None):
+        self.action = action
+        self.ip_limit_setting = ip_limit_setting
+        self.username_limit_setting = username_limit_setting
+
+    @property
+    def window(self) -> int:
+        return getattr(settings, "AUTH_THROTTLE_WINDOW", 300)
+
+    def _limits(self, ip: str, username: Optional[str]):
+        yield _key(f"{self.action}:ip", ip), getattr(settings, self.ip_limit_setting, 0)
+        if username and self.username_limit_setting:
+            yield _key(f"{self.action}:user", username), getattr(settings, self.username_limit_setting, 0)
+
+    def is_blocked(self, ip: str, username: Optional[str] = None) -> bool:
+        limits = list(self._limits(ip, username))
+        counts = cache.get_many([key for key, _ in limits])
+        return any(limit and counts.get(key, 0) >= limit for key, limit in limits)
+
+    def register(self, ip: str, username: Optional[str] = None) -> None:
+        """Count one attempt against the IP and username."""
+
+        for key, limit in self._limits(ip, username):
+            if not limit:
+                continue
+            if cache.add(key, 1, timeout=self.window):
+                continue
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr(); start a new window.
+                cache.set(key, 1, timeout=self.window)
+
+    def reset(self, username: str) -> None:
+        if self.username_limit_setting:
+            cache.delete(_key(f"{self.action}:user", username))
+
+
+# Only failed logins count; a successful login clears the username counter.
+login_limiter = AttemptLimiter("login", "AUTH_THROTTLE_LOGIN_IP_LIMIT", "AUTH_THROTTLE_LOGIN_USERNAME_LIMIT")
+# Every registration attempt counts, since each one hashes a password.
+register_limiter = AttemptLimiter("register", "AUTH_THROTTLE_REGISTER_IP_LIMIT")
@@ -0,0 +1,145 @@
+"""Time-decayed popularity of the cars, kept up to date event by event.
+
+A car's trending score is ``sum(weight * 2 ** (-age / half_life))`` over its
+favourites, comments and comment likes.  ``Car.trending_score`` stores the
+natural log of that sum with every event's decay measured from the fixed
+``EPOCH`` instead of from now, i.e. ``log(sum(weight * exp((t - EPOCH) / tau)))``
+with ``tau = half_life / ln 2``.  All cars then share the same time factor,
+so ordering by the column orders by the current score, and an event adds
+its term with a single ``UPDATE`` (log-sum-exp) without touching other rows.
+Keeping the log means the growing ``exp((t - EPOCH) / tau)`` factor cannot
+overflow.
+
+Removing a favourite, comment or like subtracts exactly the term its
+creation added.  ``manage.py compact_trending`` periodically clears the
+scores that decayed below ``TRENDING_MIN_SCORE`` (:func:`compact`) and,
+with ``--rebuild``, recomputes them from the events to drop accumulated
+rounding (:func:`rebuild`).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .models import Car, Comment, CommentLike, Favorite
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+WEIGHTS = {"favorite": 3.0, "comment": 2.0, "like": 1.0}
+# Relative precision below which a subtraction is treated as emptying the score.
+EPSILON = 1e-9
+
+
+def _tau() -> float:
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def _log_term(weight: float, at: datetime) -> float:
+    return math.log(weight) + (at - EPOCH).total_seconds() / _tau()
+
+
+def current_score(stored: Optional[float], now: Optional[datetime] = None) -> float:
+    """The decayed score a stored ``trending_score`` amounts to at ``now``."""
+
+    if stored is None:
+        return 0.0
+    now = now or timezone.now()
+    return math.exp(stored - (now - EPOCH).total_seconds() / _tau())
+
+
+def _add(cars: Q, term: float) -> None:
+    score, term = F("trending_score"), Value(term, output_field=FloatField())
+    Car.objects.filter(cars).update(
+        trending_score=Case(
+            When(trending_score__isnull=True, then=term),
+            default=Greatest(score, term) + Ln(Value(1.0) + Exp(-Abs(score - term))),
+            output_field=FloatField(),
+        )
+    )
+
+
+def _subtract(cars: Q, term: float) -> None:
+    score, term_value = F("trending_score"), Value(term, output_field=FloatField())
+    Car.objects.filter(cars, trending_score__isnull=False).update(
+        trending_score=Case(
+            # Leave at least EPSILON of the score, otherwise it is empty.
+            When(
+                trending_score__gt=term - math.log1p(-EPSILON),
+                then=score + Ln(Value(1.0) - Exp(term_value - score)),
+            ),
+            default=None,
+            output_field=FloatField(),
+        )
+    )
+
+
+def record(kind: str, cars: Q, at: datetime, removed: bool = False) -> None:
+    """Add (or with ``removed``, take back) an event of ``kind`` created ``at``."""
+
+    term = _log_term(WEIGHTS[kind], at)
+    if removed:
+        _subtract(cars, term)
+    else:
+        _add(cars, term)
+
+
+def record_many(kind: str, car_ids: Iterable[int], at: datetime) -> None:
+    """Add one event of ``kind`` per entry of ``car_ids`` (repeats count again)."""
+
+    counts: Dict[int, int] = defaultdict(int)
+    for car_id in car_ids:
+        counts[car_id] += 1
+    by_count: Dict[int, List[int]] = defaultdict(list)
+    for car_id, count in counts.items():
+        by_count[count].append(car_id)
+    for count, ids in by_count.items():
+        _add(Q(pk__in=ids), _log_term(WEIGHTS[kind] * count, at))
+
+
+def rebuild(now: Optional[datetime] = None) -> int:
+    """Recompute every score from the events; returns the number of scored cars.
+
+    Events too old to still reach ``TRENDING_MIN_SCORE`` are skipped.
+    """
+
+    now = now or timezone.now()
+    horizon = now - timedelta(
+        hours=settings.TRENDING_HALF_LIFE_HOURS
+        * math.log2(max(WEIGHTS.values()) / settings.TRENDING_MIN_SCORE)
+    )
+    tau = _tau()
+    sums: Dict[int, float] = defaultdict(float)
+    events = (
+        ("favorite", Favorite.objects.filter(created_at__gte=horizon).values_list("car_id", "created_at")),
+        ("comment", Comment.objects.filter(created_at__gte=horizon).values_list("car_id", "created_at")),
+        ("like", CommentLike.objects.filter(created_at__gte=horizon).values_list("comment__car_id", "created_at")),
+    )
+    # Sum relative to ``now`` so the exponents stay small, then shift to EPOCH.
+    shift = (now - EPOCH).total_seconds() / tau
+    for kind, rows in events:
+        weight = WEIGHTS[kind]
+        for car_id, created_at in rows.iterator(chunk_size=10000):
+            sums[car_id] += weight * math.exp((created_at - now).total_seconds() / tau)
+
+    scores = {car_id: math.log(total) + shift for car_id, total in sums.items() if total > 0}
+    with transaction.atomic():
+        Car.objects.exclude(pk__in=list(scores)).exclude(trending_score=None).update(trending_score=None)
+        cars = [Car(pk=car_id, trending_score=score) for car_id, score in scores.items()]
+        Car.objects.bulk_update(cars, ["trending_score"], batch_size=500)
+    return len(scores)
+
+
+def compact(now: Optional[datetime] = None) -> int:
+    """Clear the scores that decayed below ``TRENDING_MIN_SCORE``; returns how many."""
+
+    now = now or timezone.now()
+    threshold = math.log(settings.TRENDING_MIN_SCORE) + (now - EPOCH).total_seconds() / _tau()
+    return Car.objects.filter(trending_score__lt=threshold).update(trending_score=None)
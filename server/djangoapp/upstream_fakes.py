@@ -0,0 +1,209 @@
+"""In-process stand-ins for the dealer backend and the sentiment analyzer.
+
+``restapis`` talks to the Express/MongoDB service in ``server/database`` and
+to the Flask sentiment microservice.  The fakes below serve the same routes
+from the JSON seed files in ``settings.DEALER_DATA_DIR``, so the dealer views can
+be exercised and benchmarked without Docker.  Each fake can inject latency
+and a fraction of HTTP 500 responses to show how the views degrade.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+
+Route = Tuple[str, "re.Pattern[str]", Callable[..., object]]
+
+POSITIVE_WORDS = {
+    "best", "excellent", "fantastic", "friendly", "good", "great", "happy",
+    "helpful", "love", "nice", "recommend", "superb",
+}
+NEGATIVE_WORDS = {
+    "awful", "bad", "disappointed", "horrible", "poor", "rude", "slow",
+    "terrible", "worst",
+}
+
+
+def load_seed_data(data_dir: Optional[Path] = None) -> Tuple[List[dict], List[dict]]:
+    """Return the dealerships and reviews shipped with the Express backend."""
+
+    data_dir = Path(data_dir or settings.DEALER_DATA_DIR)
+    with open(data_dir / "dealerships.json", encoding="utf-8") as handle:
+        dealerships = json.load(handle)["dealerships"]
+    with open(data_dir / "reviews.json", encoding="utf-8") as handle:
+        reviews = json.load(handle)["reviews"]
+    return dealerships, reviews
+
+
+class FakeUpstream:
+    """Threaded HTTP server answering a fixed set of JSON routes.
+
+    ``latency_ms`` (plus up to ``jitter_ms``) is slept before every response
+    and ``error_rate`` is the probability of answering with HTTP 500.
+    """
+
+    def __init__(
+        self,
+        routes: List[Route],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.routes = routes
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Fake upstream is not running.")
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeUpstream":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake._dispatch(self, "GET")
+
+            def do_POST(self):
+                fake._dispatch(self, "POST")
+
+            def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeUpstream":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _roll(self) -> Tuple[float, bool]:
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        delay, failed = self._roll()
+        if delay:
+            time.sleep(delay / 1000)
+
+        path = unquote(urlsplit(handler.path).path)
+        status, payload = 404, {"error": "Not found"}
+        if failed:
+            status, payload = 500, {"error": "Injected failure"}
+        else:
+            for route_method, pattern, view in self.routes:
+                match = pattern.fullmatch(path)
+                if route_method == method and match:
+                    body = None
+                    if method == "POST":
+                        length = int(handler.headers.get("Content-Length") or 0)
+                        body = json.loads(handler.rfile.read(length) or b"{}")
+                    status, payload = 200, view(*match.groups(), body=body)
+                    break
+
+        encoded = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(encoded)))
+        handler.end_headers()
+        handler.wfile.write(encoded)
+
+
+def dealer_backend(data_dir: Optional[Path] = None, **options) -> FakeUpstream:
+    """Fake of the Express dealer API (``server/database/app.js``)."""
+
+    dealerships, reviews = load_seed_data(data_dir)
+    lock = threading.Lock()
+
+    def fetch_reviews(body=None):
+        return reviews
+
+    def fetch_dealer_reviews(dealer_id, body=None):
+        return [review for review in reviews if str(review["dealership"]) == dealer_id]
+
+    def fetch_dealers(body=None):
+        return dealerships
+
+    def fetch_dealers_by_state(state, body=None):
+        return [dealer for dealer in dealerships if dealer["state"] == state]
+
+    def fetch_dealer(dealer_id, body=None):
+        return [dealer for dealer in dealerships if str(dealer["id"]) == dealer_id]
+
+    def insert_review(body=None):
+        with lock:
+            review = {**(body or {}), "id": max(review["id"] for review in reviews) + 1}
+            reviews.append(review)
+        return review
+
+    routes: List[Route] = [
+        ("GET", re.compile(r"/fetchReviews"), fetch_reviews),
+        ("GET", re.compile(r"/fetchReviews/dealer/([^/]+)"), fetch_dealer_reviews),
+        ("GET", re.compile(r"/fetchDealers"), fetch_dealers),
+        ("GET", re.compile(r"/fetchDealers/([^/]+)"), fetch_dealers_by_state),
+        ("GET", re.compile(r"/fetchDealer/([^/]+)"), fetch_dealer),
+        ("POST", re.compile(r"/insert_review"), insert_review),
+    ]
+    return FakeUpstream(routes, **options)
+
+
+def score_sentiment(text: str) -> str:
+    """Cheap lexicon score standing in for the VADER analyzer."""
+
+    words = re.findall(r"[a-z']+", text.lower())
+    positive = sum(word in POSITIVE_WORDS for word in words)
+    negative = sum(word in NEGATIVE_WORDS for word in words)
+    if positive > negative:
+        return "positive"
+    if negative > positive:
+        return "negative"
+    return "neutral"
+
+
+def sentiment_analyzer(**options) -> FakeUpstream:
+    """Fake of the Flask sentiment microservice (``microservices/app.py``)."""
+
+    def analyze(text, body=None) -> Dict[str, str]:
+        return {"sentiment": score_sentiment(text)}
+
+    def analyze_batch(body=None) -> Dict[str, List[str]]:
+        texts = (body or {}).get("texts") or []
+        return {"sentiments": [score_sentiment(str(text)) for text in texts]}
+
+    routes: List[Route] = [
+        ("GET", re.compile(r"/analyze/(.*)"), analyze),
+        ("POST", re.compile(r"/analyze"), analyze_batch),
+    ]
+    return FakeUpstream(routes, **options)
@@ -17,7 +17,10 @@ urlpatterns = [
     path('api/login/', views.api_login, name='api_login'),
     path('api/logout/', views.api_logout, name='api_logout'),
     path('api/cars/', views.api_cars, name='api_cars'),
+    path('api/cars/batch/', views.api_cars_batch, name='api_cars_batch'),
     path('api/cars/<int:car_id>/', views.api_car_detail, name='api_car_detail'),
+    path('api/cars/<int:car_id>/related/', views.api_car_related, name='api_car_related'),
+    path('api/cars/<int:car_id>/similar/', views.api_car_similar, name='api_car_similar'),
     path('api/cars/<int:car_id>/comments/', views.api_car_comments, name='api_car_comments'),
     path(
         'api/cars/<int:car_id>/comments/<int:comment_id>/',
@@ -26,12 +29,22 @@ urlpatterns = [
     ),
     path('api/cars/<int:car_id>/favorite/', views.api_toggle_favorite, name='api_toggle_favorite'),
     path('api/comments/<int:comment_id>/like/', views.api_toggle_comment_like, name='api_toggle_comment_like'),
+    path('api/user/reactions/', views.api_user_reactions, name='api_user_reactions'),
     path('api/user/profile/', views.api_user_profile, name='api_user_profile'),
+    path('api/metrics/', views.api_metrics, name='api_metrics'),
 
     # Dealer-related legacy APIs
     path(route='get_dealers', view=views.get_dealerships, name='get_dealers'),
+    path(route='get_dealers/nearest', view=views.get_nearest_dealers, name='nearest_dealers'),
     path(route='get_dealers/<str:state>', view=views.get_dealerships, name='get_dealers_by_state'),
     path(route='dealer/<int:dealer_id>', view=views.get_dealer_details, name='dealer_details'),
-    path(route='reviews/dealer/<int:dealer_id>', view=views.get_dealer_reviews, name='dealer_details'),
+    path(route='inventory', view=views.get_inventory, name='inventory'),
+    path(route='reviews/dealer/<int:dealer_id>', view=views.get_dealer_reviews, name='dealer_reviews'),
+    path(
+        route='reviews/dealer/<int:dealer_id>/summary',
+        view=views.get_dealer_review_summary,
+        name='dealer_review_summary',
+    ),
     path(route='add_review', view=views.add_review, name='add_review'),
+    path(route='reviews/export', view=views.export_reviews, name='export_reviews'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
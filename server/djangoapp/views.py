@@ -4,21 +4,55 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 from decimal import Decimal, InvalidOperation
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model, login, logout
-from django.db.models import Count, Max, Min, Q
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.http import StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from . import (
+    car_views,
+    catalogue,
+    geo,
+    images,
+    inventory,
+    recommendations,
+    review_export,
+    review_summaries,
+    similarity,
+    trending,
+)
+from .dealers import directory as dealer_directory
+from .instrumentation import JsonResponse, registry
 from .models import Car, CarMake, Comment, CommentLike, Favorite
-from .populate import initiate
 from .restapis import analyze_review_sentiments, get_request, post_review
+from .throttle import client_ip, login_limiter, register_limiter
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+NEAREST_DEALERS_DEFAULT_K = 5
+NEAREST_DEALERS_MAX_K = 100
+PRICE_HISTOGRAM_BUCKETS = 8
+INVENTORY_PAGE_SIZE = 50
+INVENTORY_MAX_PAGE_SIZE = 500
+CAR_BATCH_MAX_IDS = 100
+SIMILAR_CARS_DEFAULT_K = 5
+SIMILAR_CARS_MAX_K = 50
+# api_cars ``sort`` values and their ordering; ties keep the listing order.
+CAR_SORTS = {
+    None: ("make__name", "name"),
+    "trending": (F("trending_score").desc(nulls_last=True), "make__name", "name"),
+}
+REACTION_BATCH_MAX_OPERATIONS = 200
+# Operation kind -> (model, target field) for api_user_reactions.
+REACTION_KINDS = {"favorite": (Favorite, "car_id"), "like": (CommentLike, "comment_id")}
+
 
 def _load_json(request) -> Optional[dict]:
     """Safely parse JSON from the request body."""
@@ -48,6 +82,9 @@ def _ensure_catalogue() -> None:
     """Create the default catalogue if the database is empty."""
 
     if not Car.objects.exists():
+        # The seed catalogue is a large literal; only load it when it is needed.
+        from .populate import initiate
+
         initiate()
 
 
@@ -60,6 +97,16 @@ def _parse_decimal(value: Optional[str]) -> Optional[Decimal]:
         return None
 
 
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
 def _parse_int(value: Optional[str]) -> Optional[int]:
     if value in (None, ""):
         return None
@@ -69,10 +116,32 @@ def _parse_int(value: Optional[str]) -> Optional[int]:
         return None
 
 
+def _car_id_items(value: object) -> Optional[list]:
+    """The raw items of a ``"1,5,9"`` string or a JSON list of car ids."""
+
+    items = value.split(",") if isinstance(value, str) else value
+    return items if isinstance(items, list) else None
+
+
+def _parse_car_ids(items: list) -> Optional[List[int]]:
+    """Car ids from :func:`_car_id_items`, in order with duplicates dropped."""
+
+    ids: Dict[int, None] = {}
+    for item in items:
+        if isinstance(item, (bool, float)):
+            return None
+        car_id = _parse_int(item.strip() if isinstance(item, str) else item)
+        if car_id is None or car_id <= 0:
+            return None
+        ids[car_id] = None
+    return list(ids)
+
+
 def _serialize_car(
     car: Car,
     favorite_ids: Optional[Iterable[int]] = None,
     include_description: bool = False,
+    image_size: str = "list",
 ) -> Dict[str, object]:
     data = {
         "id": car.id,
@@ -82,6 +151,8 @@ def _serialize_car(
         "type": car.car_type,
         "price": float(car.price),
         "image_url": car.image_url,
+        "image": images.variant_urls(car, image_size),
+        "trending": round(trending.current_score(car.trending_score), 4),
         "favorite_count": getattr(car, "favorite_count", None)
         if getattr(car, "favorite_count", None) is not None
         else car.favorites.count(),
@@ -152,6 +223,14 @@ def _comment_tree(car_id: int, user: Optional[User]) -> List[Dict[str, object]]:
     return roots
 
 
+def _too_many_attempts(limiter) -> JsonResponse:
+    response = JsonResponse(
+        {"error": "Muitas tentativas. Tente novamente mais tarde."}, status=429
+    )
+    response["Retry-After"] = str(limiter.window)
+    return response
+
+
 @csrf_exempt
 def api_register(request):
     if request.method != "POST":
@@ -170,16 +249,23 @@ def api_register(request):
     if not username or not password:
         return JsonResponse({"error": "Usuário e senha são obrigatórios."}, status=400)
 
-    if User.objects.filter(username=username).exists():
-        return JsonResponse({"error": "Usuário já registrado."}, status=400)
+    ip = client_ip(request)
+    if register_limiter.is_blocked(ip):
+        return _too_many_attempts(register_limiter)
+    register_limiter.register(ip)
 
-    user = User.objects.create_user(
-        username=username,
-        password=password,
-        first_name=first_name,
-        last_name=last_name,
-        email=email,
-    )
+    # The unique constraint on username decides duplicates; no exists() round-trip.
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+            )
+    except IntegrityError:
+        return JsonResponse({"error": "Usuário já registrado."}, status=400)
     login(request, user)
     return JsonResponse({"user": _user_payload(user)}, status=201)
 
@@ -198,10 +284,16 @@ def api_login(request):
     if not username or not password:
         return JsonResponse({"error": "Credenciais incompletas."}, status=400)
 
+    ip = client_ip(request)
+    if login_limiter.is_blocked(ip, username):
+        return _too_many_attempts(login_limiter)
+
     user = authenticate(request, username=username, password=password)
     if user is None:
+        login_limiter.register(ip, username)
         return JsonResponse({"error": "Credenciais inválidas."}, status=401)
 
+    login_limiter.reset(username)
     login(request, user)
     return JsonResponse({"user": _user_payload(user)})
 
@@ -214,39 +306,160 @@ def api_logout(request):
     return JsonResponse({"status": "ok"})
 
 
+def _car_filter_values(request) -> catalogue.Filters:
+    """The active catalogue filters of ``request``, keyed by the facet they restrict."""
+
+    filters: catalogue.Filters = {}
+    for name in ("search", "brand", "type"):
+        value = request.GET.get(name)
+        if value and value.strip():
+            filters[name] = value
+    price = (_parse_decimal(request.GET.get("price_min")), _parse_decimal(request.GET.get("price_max")))
+    if price != (None, None):
+        filters["price"] = price
+    year = (_parse_int(request.GET.get("year_min")), _parse_int(request.GET.get("year_max")))
+    if year != (None, None):
+        filters["year"] = year
+    return filters
+
+
+def _car_filters(values: catalogue.Filters) -> Dict[str, Q]:
+    """The filters of :func:`_car_filter_values` as ORM conditions."""
+
+    filters: Dict[str, Q] = {}
+    if "search" in values:
+        filters["search"] = Q(name__icontains=values["search"]) | Q(make__name__icontains=values["search"])
+    if "brand" in values:
+        filters["brand"] = Q(make__name__iexact=values["brand"].strip())
+    if "type" in values:
+        filters["type"] = Q(car_type__iexact=values["type"].strip())
+    for name in ("price", "year"):
+        if name in values:
+            low, high = values[name]
+            condition = Q()
+            if low is not None:
+                condition &= Q(**{f"{name}__gte": low})
+            if high is not None:
+                condition &= Q(**{f"{name}__lte": high})
+            filters[name] = condition
+    return filters
+
+
+def _price_buckets(low: Optional[Decimal], high: Optional[Decimal]) -> List[Tuple[Decimal, Decimal]]:
+    if low is None or high is None:
+        return []
+    if low == high:
+        return [(low, high)]
+    width = (high - low) / PRICE_HISTOGRAM_BUCKETS
+    return [(low + width * index, low + width * (index + 1)) for index in range(PRICE_HISTOGRAM_BUCKETS)]
+
+
+def _car_facets(
+    filters: Dict[str, Q],
+    brands: List[str],
+    years: List[int],
+    buckets: List[Tuple[Decimal, Decimal]],
+) -> Dict[str, List[Dict[str, object]]]:
+    """Facet counts that apply every active filter except the facet's own.
+
+    Each facet costs one grouped query, whatever the number of values, and
+    values without matches are listed with a zero count.
+    """
+
+    def others(name: str):
+        return Car.objects.filter(*(q for key, q in filters.items() if key != name))
+
+    brand_counts = dict(
+        others("brand").values_list("make__name").annotate(count=Count("id")).order_by()
+    )
+    year_counts = dict(others("year").values_list("year").annotate(count=Count("id")).order_by())
+    type_counts = dict(others("type").values_list("car_type").annotate(count=Count("id")).order_by())
+
+    last = len(buckets) - 1
+    bucket_counts = others("price").aggregate(
+        **{
+            f"bucket_{index}": Count(
+                "id",
+                filter=Q(price__gte=low) & (Q(price__lte=high) if index == last else Q(price__lt=high)),
+            )
+            for index, (low, high) in enumerate(buckets)
+        }
+    ) if buckets else {}
+
+    return _facets_payload(
+        brands,
+        years,
+        buckets,
+        brand_counts,
+        year_counts,
+        type_counts,
+        [bucket_counts[f"bucket_{index}"] for index in range(len(buckets))],
+    )
+
+
+def _snapshot_facets(
+    snapshot: catalogue.CatalogueSnapshot,
+    filters: catalogue.Filters,
+    buckets: List[Tuple[Decimal, Decimal]],
+) -> Dict[str, List[Dict[str, object]]]:
+    """:func:`_car_facets` computed on the in-memory catalogue."""
+
+    return _facets_payload(
+        snapshot.brands,
+        snapshot.year_values,
+        buckets,
+        snapshot.brand_counts(snapshot.match(filters, skip="brand")),
+        snapshot.year_counts(snapshot.match(filters, skip="year")),
+        snapshot.type_counts(snapshot.match(filters, skip="type")),
+        snapshot.price_counts(snapshot.match(filters, skip="price"), buckets),
+    )
+
+
+def _facets_payload(
+    brands: List[str],
+    years: List[int],
+    buckets: List[Tuple[Decimal, Decimal]],
+    brand_counts: Dict[str, int],
+    year_counts: Dict[int, int],
+    type_counts: Dict[str, int],
+    bucket_counts: List[int],
+) -> Dict[str, List[Dict[str, object]]]:
+    return {
+        "brands": [{"value": name, "count": brand_counts.get(name, 0)} for name in brands],
+        "years": [{"value": year, "count": year_counts.get(year, 0)} for year in years],
+        "types": [
+            {"value": code, "label": label, "count": type_counts.get(code, 0)}
+            for code, label in Car.CAR_TYPES
+        ],
+        "price": [
+            {"min": float(low), "max": float(high), "count": count}
+            for (low, high), count in zip(buckets, bucket_counts)
+        ],
+    }
+
+
+def _price_payload(low: Optional[Decimal], high: Optional[Decimal]) -> Dict[str, Optional[float]]:
+    return {
+        "min": float(low) if low is not None else None,
+        "max": float(high) if high is not None else None,
+    }
+
+
 @csrf_exempt
 def api_cars(request):
     if request.method != "GET":
         return JsonResponse({"error": "Método não permitido."}, status=405)
 
-    _ensure_catalogue()
-
-    cars = Car.objects.select_related("make").annotate(
-        favorite_count=Count("favorites", distinct=True),
-        comment_count=Count("comments", distinct=True),
-    )
+    if "ids" in request.GET:
+        return _car_batch(request, request.GET["ids"])
 
-    search = request.GET.get("search")
-    if search:
-        cars = cars.filter(Q(name__icontains=search) | Q(make__name__icontains=search))
+    sort = request.GET.get("sort") or None
+    if sort not in CAR_SORTS:
+        return JsonResponse({"error": "Ordenação inválida."}, status=400)
 
-    brand = request.GET.get("brand")
-    if brand:
-        cars = cars.filter(make__name__iexact=brand.strip())
-
-    price_min = _parse_decimal(request.GET.get("price_min"))
-    price_max = _parse_decimal(request.GET.get("price_max"))
-    if price_min is not None:
-        cars = cars.filter(price__gte=price_min)
-    if price_max is not None:
-        cars = cars.filter(price__lte=price_max)
+    _ensure_catalogue()
 
-    year_min = _parse_int(request.GET.get("year_min"))
-    year_max = _parse_int(request.GET.get("year_max"))
-    if year_min is not None:
-        cars = cars.filter(year__gte=year_min)
-    if year_max is not None:
-        cars = cars.filter(year__lte=year_max)
+    values = _car_filter_values(request)
 
     favorite_ids: Optional[Iterable[int]] = None
     if request.user.is_authenticated:
@@ -254,13 +467,37 @@ def api_cars(request):
             Favorite.objects.filter(user=request.user).values_list("car_id", flat=True)
         )
 
-    car_list = [_serialize_car(car, favorite_ids) for car in cars.order_by("make__name", "name")]
+    if settings.CATALOGUE_ENGINE == "memory":
+        snapshot, overlay = catalogue.engine.snapshot(), catalogue.engine.overlay()
+        buckets = _price_buckets(snapshot.min_price, snapshot.max_price)
+        rank = overlay.trending_rank(snapshot) if sort == "trending" else None
+        cars = overlay.apply(snapshot.select(snapshot.match(values), rank=rank))
+        return JsonResponse(
+            {
+                "cars": [_serialize_car(car, favorite_ids) for car in cars],
+                "filters": {
+                    "brands": snapshot.brands,
+                    "years": snapshot.year_values,
+                    "price": _price_payload(snapshot.min_price, snapshot.max_price),
+                },
+                "facets": _snapshot_facets(snapshot, values, buckets),
+            }
+        )
+
+    filters = _car_filters(values)
+    cars = Car.objects.select_related("make").annotate(
+        favorite_count=Count("favorites", distinct=True),
+        comment_count=Count("comments", distinct=True),
+    ).filter(*filters.values())
+
+    car_list = [_serialize_car(car, favorite_ids) for car in cars.order_by(*CAR_SORTS[sort])]
 
     price_range = Car.objects.aggregate(min_price=Min("price"), max_price=Max("price"))
     brands = list(CarMake.objects.filter(cars__isnull=False).order_by("name").values_list("name", flat=True).distinct())
     years = list(
         Car.objects.order_by("-year").values_list("year", flat=True).distinct()
     )
+    buckets = _price_buckets(price_range["min_price"], price_range["max_price"])
 
     return JsonResponse(
         {
@@ -268,15 +505,74 @@ def api_cars(request):
             "filters": {
                 "brands": brands,
                 "years": years,
-                "price": {
-                    "min": float(price_range["min_price"]) if price_range["min_price"] is not None else None,
-                    "max": float(price_range["max_price"]) if price_range["max_price"] is not None else None,
-                },
+                "price": _price_payload(price_range["min_price"], price_range["max_price"]),
             },
+            "facets": _car_facets(filters, brands, years, buckets),
+        }
+    )
+
+
+def _cars_by_id(car_ids: List[int]) -> Dict[int, Optional[Car]]:
+    """Cars with their counts, from the catalogue engine, in one query at most."""
+
+    if settings.CATALOGUE_ENGINE == "memory":
+        snapshot, overlay = catalogue.engine.snapshot(), catalogue.engine.overlay()
+        found = {car.id: car for car in overlay.apply(filter(None, map(snapshot.get, car_ids)))}
+        return {car_id: found.get(car_id) for car_id in car_ids}
+    return Car.objects.select_related("make").annotate(
+        favorite_count=Count("favorites", distinct=True),
+        comment_count=Count("comments", distinct=True),
+    ).in_bulk(car_ids)
+
+
+def _car_batch(request, value: object):
+    """The cars listed in ``value`` in the requested order, plus the ids that do not exist."""
+
+    items = _car_id_items(value)
+    if items is None:
+        return JsonResponse({"error": "Lista de carros inválida."}, status=400)
+    # Capped before parsing, so an oversized list is rejected without parsing it.
+    if len(items) > CAR_BATCH_MAX_IDS:
+        return JsonResponse(
+            {"error": f"Máximo de {CAR_BATCH_MAX_IDS} carros por requisição."}, status=400
+        )
+    if not items:
+        return JsonResponse({"error": "Informe ao menos um carro."}, status=400)
+    car_ids = _parse_car_ids(items)
+    if car_ids is None:
+        return JsonResponse({"error": "Lista de carros inválida."}, status=400)
+
+    _ensure_catalogue()
+
+    favorite_ids: Optional[Iterable[int]] = None
+    if request.user.is_authenticated:
+        favorite_ids = set(
+            Favorite.objects.filter(user=request.user, car_id__in=car_ids).values_list("car_id", flat=True)
+        )
+
+    found = _cars_by_id(car_ids)
+    return JsonResponse(
+        {
+            "cars": [_serialize_car(found[car_id], favorite_ids) for car_id in car_ids if found.get(car_id)],
+            "missing": [car_id for car_id in car_ids if not found.get(car_id)],
         }
     )
 
 
+@csrf_exempt
+def api_cars_batch(request):
+    """``POST {"ids": [...]}`` variant of ``api/cars/?ids=``, for long id lists."""
+
+    if request.method != "POST":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    data = _load_json(request)
+    if data is None or not isinstance(data, dict):
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+
+    return _car_batch(request, data.get("ids"))
+
+
 @csrf_exempt
 def api_car_detail(request, car_id: int):
     if request.method != "GET":
@@ -284,17 +580,23 @@ def api_car_detail(request, car_id: int):
 
     _ensure_catalogue()
 
-    try:
-        car = (
-            Car.objects.select_related("make")
-            .annotate(
-                favorite_count=Count("favorites", distinct=True),
-                comment_count=Count("comments", distinct=True),
+    if settings.CATALOGUE_ENGINE == "memory":
+        car = catalogue.engine.snapshot().get(car_id)
+        if car is None:
+            return JsonResponse({"error": "Carro não encontrado."}, status=404)
+        car = catalogue.engine.overlay().apply([car])[0]
+    else:
+        try:
+            car = (
+                Car.objects.select_related("make")
+                .annotate(
+                    favorite_count=Count("favorites", distinct=True),
+                    comment_count=Count("comments", distinct=True),
+                )
+                .get(pk=car_id)
             )
-            .get(pk=car_id)
-        )
-    except Car.DoesNotExist:
-        return JsonResponse({"error": "Carro não encontrado."}, status=404)
+        except Car.DoesNotExist:
+            return JsonResponse({"error": "Carro não encontrado."}, status=404)
 
     favorite_ids: Optional[Iterable[int]] = None
     if request.user.is_authenticated:
@@ -302,10 +604,91 @@ def api_car_detail(request, car_id: int):
             Favorite.objects.filter(user=request.user, car_id=car_id).values_list("car_id", flat=True)
         )
 
-    data = _serialize_car(car, favorite_ids=favorite_ids, include_description=True)
+    car_views.record(car_id)
+    data = _serialize_car(car, favorite_ids=favorite_ids, include_description=True, image_size="detail")
     return JsonResponse({"car": data})
 
 
+@csrf_exempt
+def api_car_related(request, car_id: int):
+    """Cars most often favourited by the users who favourited ``car_id``."""
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    limit = _parse_int(request.GET["k"]) if "k" in request.GET else settings.RELATED_CARS_K
+    if limit is None or limit <= 0:
+        return JsonResponse({"error": "Parâmetro k inválido."}, status=400)
+
+    neighbors = recommendations.neighbors(car_id)
+    if neighbors is None:
+        if not Car.objects.filter(pk=car_id).exists():
+            return JsonResponse({"error": "Carro não encontrado."}, status=404)
+        neighbors = []
+    neighbors = neighbors[:limit]
+
+    related_ids = [int(related_id) for related_id, _, _ in neighbors]
+    favorite_ids: Optional[Iterable[int]] = None
+    if request.user.is_authenticated and related_ids:
+        favorite_ids = set(
+            Favorite.objects.filter(user=request.user, car_id__in=related_ids).values_list("car_id", flat=True)
+        )
+    cars = _cars_by_id(related_ids) if related_ids else {}
+
+    return JsonResponse(
+        {
+            "car_id": car_id,
+            "related": [
+                {**_serialize_car(cars[int(related_id)], favorite_ids), "score": score, "shared": shared}
+                for related_id, score, shared in neighbors
+                if cars.get(int(related_id))
+            ],
+        }
+    )
+
+
+@csrf_exempt
+def api_car_similar(request, car_id: int):
+    """Cars closest to ``car_id`` by price, year and body type.
+
+    ``same_make=1`` restricts the search to the car's make.
+    """
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    k = _parse_int(request.GET.get("k"))
+    if k is None:
+        k = SIMILAR_CARS_DEFAULT_K
+    if not 0 < k <= SIMILAR_CARS_MAX_K:
+        return JsonResponse({"error": "Parâmetro k inválido."}, status=400)
+
+    similar = similarity.index().similar(
+        car_id, k=k, same_make=request.GET.get("same_make") in ("1", "true")
+    )
+    if similar is None:
+        return JsonResponse({"error": "Carro não encontrado."}, status=404)
+
+    similar_ids = [similar_id for _, similar_id in similar]
+    favorite_ids: Optional[Iterable[int]] = None
+    if request.user.is_authenticated and similar_ids:
+        favorite_ids = set(
+            Favorite.objects.filter(user=request.user, car_id__in=similar_ids).values_list("car_id", flat=True)
+        )
+    cars = _cars_by_id(similar_ids) if similar_ids else {}
+
+    return JsonResponse(
+        {
+            "car_id": car_id,
+            "similar": [
+                {**_serialize_car(cars[similar_id], favorite_ids), "distance": round(distance, 4)}
+                for distance, similar_id in similar
+                if cars.get(similar_id)
+            ],
+        }
+    )
+
+
 @csrf_exempt
 def api_car_comments(request, car_id: int):
     _ensure_catalogue()
@@ -446,6 +829,137 @@ def api_toggle_comment_like(request, comment_id: int):
     return JsonResponse({"liked": liked, "likes": count})
 
 
+def _parse_reactions(operations: object) -> Optional[Dict[str, Dict[int, bool]]]:
+    """Final state per target of a list of ``{"kind", "id", "set"}`` operations.
+
+    Operations are applied in order, so a later one on the same target wins.
+    """
+
+    if not isinstance(operations, list):
+        return None
+    wanted: Dict[str, Dict[int, bool]] = {kind: {} for kind in REACTION_KINDS}
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get("kind") not in REACTION_KINDS:
+            return None
+        target = operation.get("id")
+        value = operation.get("set")
+        if isinstance(target, bool) or not isinstance(target, int) or not isinstance(value, bool):
+            return None
+        wanted[operation["kind"]][target] = value
+    return wanted
+
+
+def _insert_new(model, rows: list) -> list:
+    """Insert ``rows``, skipping the ones that already exist; returns those inserted.
+
+    ``bulk_create(ignore_conflicts=True)`` would return the skipped rows too,
+    so a conflict (a concurrent request got there first) falls back to one
+    insert per row.
+    """
+
+    try:
+        with transaction.atomic():
+            return model.objects.bulk_create(rows)
+    except IntegrityError:
+        pass
+    inserted = []
+    for row in rows:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([row])
+        except IntegrityError:
+            continue
+        inserted.append(row)
+    return inserted
+
+
+@csrf_exempt
+def api_user_reactions(request):
+    """Set or unset several favourites and comment likes in one transaction.
+
+    Unlike the toggle endpoints, each operation states the desired state, so
+    replaying a batch is harmless.  The response holds the new state and
+    count of every car and comment the batch touched.
+    """
+
+    if request.method != "POST":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Autenticação necessária."}, status=403)
+
+    data = _load_json(request)
+    if data is None or not isinstance(data, dict):
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+
+    operations = data.get("operations")
+    if isinstance(operations, list) and len(operations) > REACTION_BATCH_MAX_OPERATIONS:
+        return JsonResponse(
+            {"error": f"Máximo de {REACTION_BATCH_MAX_OPERATIONS} operações por requisição."}, status=400
+        )
+    wanted = _parse_reactions(operations)
+    if wanted is None:
+        return JsonResponse({"error": "Operações inválidas."}, status=400)
+
+    def absent(model, ids: Iterable[int]) -> List[int]:
+        return sorted(set(ids) - set(model.objects.filter(pk__in=ids).values_list("pk", flat=True)))
+
+    missing = {"cars": absent(Car, wanted["favorite"]), "comments": absent(Comment, wanted["like"])}
+    if missing["cars"] or missing["comments"]:
+        return JsonResponse({"error": "Carro ou comentário não encontrado.", "missing": missing}, status=404)
+
+    counts: Dict[str, Dict[int, int]] = {}
+    created_favorites: List[int] = []
+    with transaction.atomic():
+        for kind, (model, field) in REACTION_KINDS.items():
+            targets = wanted[kind]
+            if not targets:
+                continue
+            to_set = [target for target, value in targets.items() if value]
+            existing = set(
+                model.objects.filter(user=request.user, **{f"{field}__in": to_set}).values_list(field, flat=True)
+            )
+            created = _insert_new(
+                model, [model(user=request.user, **{field: target}) for target in to_set if target not in existing]
+            )
+            if created:
+                # bulk_create sends no post_save for the trending signal handler.
+                car_ids = [row.car_id for row in created] if kind == "favorite" else list(
+                    Comment.objects.filter(pk__in=[row.comment_id for row in created]).values_list("car_id", flat=True)
+                )
+                trending.record_many(kind, car_ids, created[0].created_at)
+                if kind == "favorite":
+                    created_favorites = car_ids
+            model.objects.filter(
+                user=request.user, **{f"{field}__in": [target for target, value in targets.items() if not value]}
+            ).delete()
+            counts[kind] = dict(
+                model.objects.filter(**{f"{field}__in": list(targets)})
+                .values_list(field)
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+        if wanted["favorite"]:
+            if created_favorites:
+                # bulk_create sends no post_save, so the signal handlers miss it.
+                recommendations.mark_stale(request.user.id, created_favorites)
+            favorite_counts = {car_id: counts["favorite"].get(car_id, 0) for car_id in wanted["favorite"]}
+            transaction.on_commit(lambda: catalogue.engine.update_counts("favorite", favorite_counts))
+
+    return JsonResponse(
+        {
+            "favorites": [
+                {"car_id": car_id, "favorited": value, "favorites": counts["favorite"].get(car_id, 0)}
+                for car_id, value in wanted["favorite"].items()
+            ],
+            "likes": [
+                {"comment_id": comment_id, "liked": value, "likes": counts["like"].get(comment_id, 0)}
+                for comment_id, value in wanted["like"].items()
+            ],
+        }
+    )
+
+
 @csrf_exempt
 def api_user_profile(request):
     if request.method != "GET":
@@ -502,11 +1016,29 @@ def api_user_profile(request):
     )
 
 
+@csrf_exempt
+def api_metrics(request):
+    """Latency and query-count percentiles per URL name (staff only)."""
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Acesso restrito a administradores."}, status=403)
+
+    return JsonResponse({"endpoints": registry.summary()})
+
+
 # Legacy endpoints retained for compatibility with the existing dealer views
 
 
 @csrf_exempt
 def get_dealerships(request, state="All"):
+    snapshot = dealer_directory.snapshot()
+    if snapshot is not None:
+        dealerships = snapshot.dealers if state == "All" else snapshot.by_state.get(state, [])
+        return JsonResponse({"status": 200, "dealers": dealerships})
+
     if state == "All":
         endpoint = "/fetchDealers"
     else:
@@ -515,6 +1047,90 @@ def get_dealerships(request, state="All"):
     return JsonResponse({"status": 200, "dealers": dealerships})
 
 
+@csrf_exempt
+def get_nearest_dealers(request):
+    """Dealers closest to ``lat``/``long``: the ``k`` nearest and/or all within ``radius`` km."""
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    lat = _parse_float(request.GET.get("lat"))
+    lon = _parse_float(request.GET.get("long"))
+    if lat is None or lon is None or not geo.valid_coordinate(lat, lon):
+        return JsonResponse({"error": "Coordenadas inválidas."}, status=400)
+    radius = _parse_float(request.GET.get("radius"))
+    if request.GET.get("radius") and (radius is None or radius <= 0):
+        return JsonResponse({"error": "Raio inválido."}, status=400)
+    k = _parse_int(request.GET.get("k"))
+    if request.GET.get("k") and (k is None or k <= 0):
+        return JsonResponse({"error": "Parâmetro k inválido."}, status=400)
+
+    snapshot = dealer_directory.snapshot()
+    if snapshot is None:
+        return JsonResponse({"error": "Serviço de concessionárias indisponível."}, status=503)
+    if k is None and radius is not None:
+        matches = snapshot.geo.within(lat, lon, radius)
+    else:
+        k = min(k or NEAREST_DEALERS_DEFAULT_K, NEAREST_DEALERS_MAX_K)
+        matches = snapshot.geo.nearest(lat, lon, k, max_km=radius)
+
+    counts = None
+    if request.GET.get("inventory") in ("1", "true"):
+        counts = inventory.dealer_inventory_counts()
+        if counts is None:
+            return JsonResponse({"error": "Inventário indisponível."}, status=503)
+    dealers = []
+    for distance, dealer in matches:
+        entry = {**dealer, "distance_km": round(distance, 3)}
+        if counts is not None:
+            entry["inventory_count"] = counts.get(int(dealer["id"]), 0)
+        dealers.append(entry)
+    return JsonResponse({"status": 200, "dealers": dealers})
+
+
+@csrf_exempt
+def get_inventory(request):
+    """Cars in dealer stock filtered by dealer, make, model, body type, year and mileage."""
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    dealer_ids = [_parse_int(value) for value in request.GET.getlist("dealer_id")]
+    if None in dealer_ids:
+        return JsonResponse({"error": "Concessionária inválida."}, status=400)
+    numbers = {
+        name: _parse_int(request.GET.get(name))
+        for name in ("year_min", "year_max", "mileage_max", "limit", "offset")
+    }
+    if any(request.GET.get(name) and value is None for name, value in numbers.items()):
+        return JsonResponse({"error": "Parâmetros numéricos inválidos."}, status=400)
+    limit = min(max(numbers["limit"] or INVENTORY_PAGE_SIZE, 1), INVENTORY_MAX_PAGE_SIZE)
+    offset = max(numbers["offset"] or 0, 0)
+
+    index = inventory.inventory.index()
+    if index is None:
+        return JsonResponse({"error": "Inventário indisponível."}, status=503)
+
+    equals = {name: request.GET.getlist(name) for name in ("make", "model", "body_type") if request.GET.getlist(name)}
+    if dealer_ids:
+        equals["dealer_id"] = dealer_ids
+    matches = index.match(
+        equals,
+        {
+            "year": (numbers["year_min"], numbers["year_max"]),
+            "mileage": (None, numbers["mileage_max"]),
+        },
+    )
+    return JsonResponse(
+        {
+            "status": 200,
+            "total": matches.bit_count(),
+            "cars": index.rows(matches, offset, limit),
+            "facets": index.facets(matches),
+        }
+    )
+
+
 @csrf_exempt
 def get_dealer_reviews(request, dealer_id):
     if not dealer_id:
@@ -527,10 +1143,64 @@ def get_dealer_reviews(request, dealer_id):
     return JsonResponse({"status": 200, "reviews": reviews})
 
 
+@csrf_exempt
+def get_dealer_review_summary(request, dealer_id):
+    summary = review_summaries.get_summary(dealer_id)
+    if summary is None:
+        # Being built in the background; the client should retry shortly.
+        return JsonResponse({"status": 202, "message": "Summary not ready yet"}, status=202)
+    return JsonResponse({"status": 200, "summary": review_summaries.summary_payload(summary)})
+
+
+@csrf_exempt
+def export_reviews(request):
+    """Stream every review (optionally by state/purchase date) as JSON Lines or CSV."""
+
+    if request.method != "GET":
+        return JsonResponse({"error": "Método não permitido."}, status=405)
+
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Acesso restrito a administradores."}, status=403)
+
+    export_format = request.GET.get("format", "jsonl")
+    if export_format not in ("jsonl", "csv"):
+        return JsonResponse({"error": "Formato inválido. Use jsonl ou csv."}, status=400)
+
+    since = review_export.parse_review_date(request.GET.get("since"))
+    until = review_export.parse_review_date(request.GET.get("until"))
+    if (request.GET.get("since") and since is None) or (request.GET.get("until") and until is None):
+        return JsonResponse({"error": "Data inválida."}, status=400)
+
+    snapshot = dealer_directory.snapshot()
+    if snapshot is None:
+        return JsonResponse({"error": "Serviço de concessionárias indisponível."}, status=503)
+    state = request.GET.get("state")
+    dealers = snapshot.by_state.get(state, []) if state else snapshot.dealers
+
+    rows = review_export.with_sentiment(
+        review_export.iter_reviews([dealer["id"] for dealer in dealers], since, until),
+        settings.REVIEW_EXPORT_BATCH_SIZE,
+    )
+    if export_format == "csv":
+        response = StreamingHttpResponse(review_export.render_csv(rows), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="reviews.csv"'
+    else:
+        response = StreamingHttpResponse(
+            review_export.render_jsonl(rows), content_type="application/x-ndjson"
+        )
+    return response
+
+
 @csrf_exempt
 def get_dealer_details(request, dealer_id):
     if not dealer_id:
         return JsonResponse({"status": 400, "message": "Bad Request"})
+    snapshot = dealer_directory.snapshot()
+    if snapshot is not None:
+        # Same shape as the backend's ``/fetchDealer/<id>``: a list of matches.
+        dealer = snapshot.by_id.get(int(dealer_id))
+        return JsonResponse({"status": 200, "dealer": [dealer] if dealer else []})
+
     endpoint = f"/fetchDealer/{dealer_id}"
     dealership = get_request(endpoint)
     return JsonResponse({"status": 200, "dealer": dealership})
@@ -544,10 +1214,12 @@ def add_review(request):
     if data is None:
         return JsonResponse({"status": 400, "message": "Invalid payload"})
     try:
-        post_review(data)
+        saved = post_review(data)
     except Exception as exc:  # pragma: no cover - network failure case
         logger.exception("Error posting review: %s", exc)
         return JsonResponse({"status": 401, "message": "Error in posting review"})
+    if isinstance(saved, dict) and "error" not in saved:
+        review_summaries.record_review_later(data)
     return JsonResponse({"status": 200})
 
 
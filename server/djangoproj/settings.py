@@ -13,6 +13,18 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+
+def _env_choice(name, default, choices):
+    """The environment variable ``name``, which must be one of ``choices``."""
+    value = os.getenv(name, default)
+    if value not in choices:
+        raise ImproperlyConfigured(
+            '{} must be one of {}, not {!r}.'.format(name, ', '.join(map(repr, choices)), value)
+        )
+    return value
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -56,14 +68,34 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'djangoapp.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'djangoapp.middleware.ReplicaReadMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query/latency metrics (see djangoapp.middleware).
+REQUEST_METRICS_MAX_SAMPLES = int(os.getenv('REQUEST_METRICS_MAX_SAMPLES', '1000'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'djangoapp.metrics': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'djangoproj.urls'
 
 TEMPLATES = [
@@ -72,10 +104,15 @@ TEMPLATES = [
         'DIRS': [
             os.path.join(BASE_DIR, 'frontend/static'),
             os.path.join(BASE_DIR, 'frontend/build'),
-            os.path.join(BASE_DIR, 'frontend/build/static'),
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory, also with DEBUG on.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -92,13 +129,125 @@ WSGI_APPLICATION = 'djangoproj.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_PROFILE selects 'sqlite' (default) or 'postgres'.
+#
+# SQLite connections switch to WAL journaling with synchronous=NORMAL, a busy
+# timeout and a memory-mapped I/O window, and open write transactions with
+# BEGIN IMMEDIATE so concurrent writers queue on the busy timeout instead of
+# failing with "database is locked".
+#
+# PostgreSQL keeps connections open for DATABASE_CONN_MAX_AGE seconds with
+# health checks, or uses a psycopg connection pool (requires psycopg[pool])
+# when DATABASE_POOL=true.
+DATABASE_PROFILE = _env_choice('DATABASE_PROFILE', 'sqlite', ['sqlite', 'postgres'])
+
+if DATABASE_PROFILE == 'postgres':
+    _DATABASE_POOL = os.getenv('DATABASE_POOL', 'false').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DATABASE_NAME', 'dealerships'),
+            'USER': os.getenv('DATABASE_USER', 'postgres'),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
+            'HOST': os.getenv('DATABASE_HOST', 'localhost'),
+            'PORT': os.getenv('DATABASE_PORT', '5432'),
+            # Pooled connections are returned to the pool, not kept per thread.
+            'CONN_MAX_AGE': 0 if _DATABASE_POOL else int(os.getenv('DATABASE_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+                },
+            } if _DATABASE_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size={};'.format(
+                        int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))
+                    )
+                ),
+                'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# Cache shared by sessions, auth throttling and upstream coalescing.
+# The in-memory default is per process; use redis/memcached with several workers.
+_CACHE_BACKEND_CLASSES = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+CACHE_BACKEND = _env_choice('CACHE_BACKEND', 'locmem', list(_CACHE_BACKEND_CLASSES))
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': _CACHE_BACKEND_CLASSES[CACHE_BACKEND],
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Session storage: 'db' (Django default), 'cached_db', 'cache' or 'signed_cookies'.
+SESSION_BACKEND = _env_choice('SESSION_BACKEND', 'db', ['db', 'cached_db', 'cache', 'signed_cookies'])
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_BACKEND}'
+
+AUTHENTICATION_BACKENDS = [
+    'djangoapp.backends.SessionUserModelBackend',
+]
+
+# Password hashing. PASSWORD_HASHER picks the hasher for new and re-hashed
+# passwords ('pbkdf2' or 'argon2', the latter needs argon2-cffi); the others
+# stay listed so existing hashes keep verifying and are upgraded on login.
+_PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'djangoapp.hashers.ConfigurablePBKDF2PasswordHasher',
+    'argon2': 'djangoapp.hashers.ConfigurableArgon2PasswordHasher',
+}
+PASSWORD_HASHER = _env_choice('PASSWORD_HASHER', 'pbkdf2', list(_PASSWORD_HASHER_CLASSES))
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '0')) or None
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '0')) or None
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '0')) or None
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '0')) or None
+
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Authentication attempt limits per AUTH_THROTTLE_WINDOW seconds (0 disables).
+AUTH_THROTTLE_WINDOW = int(os.getenv('AUTH_THROTTLE_WINDOW', '300'))
+AUTH_THROTTLE_LOGIN_IP_LIMIT = int(os.getenv('AUTH_THROTTLE_LOGIN_IP_LIMIT', '50'))
+AUTH_THROTTLE_LOGIN_USERNAME_LIMIT = int(os.getenv('AUTH_THROTTLE_LOGIN_USERNAME_LIMIT', '5'))
+AUTH_THROTTLE_REGISTER_IP_LIMIT = int(os.getenv('AUTH_THROTTLE_REGISTER_IP_LIMIT', '20'))
+
+# Optional read replica: DATABASE_REPLICA_NAME (a second SQLite file, e.g.
+# kept in sync with `manage.py sync_sqlite_replica`) or, for PostgreSQL,
+# DATABASE_REPLICA_HOST. Only the views in REPLICA_READ_VIEWS read from it,
+# and a user who just wrote reads from the primary for REPLICA_STICKY_SECONDS.
+_DATABASE_REPLICA = os.getenv(
+    'DATABASE_REPLICA_HOST' if DATABASE_PROFILE == 'postgres' else 'DATABASE_REPLICA_NAME'
+)
+if _DATABASE_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST' if DATABASE_PROFILE == 'postgres' else 'NAME': _DATABASE_REPLICA,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['djangoapp.routers.PrimaryReplicaRouter']
+REPLICA_READ_VIEWS = ['api_cars', 'api_car_detail', 'api_car_comments', 'getcars']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME':
@@ -139,15 +288,90 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_ROOT = os.path.join(STATIC_ROOT, 'media')
-MEDIA_URL = '/media/'
+# Point MEDIA_URL at a CDN in front of MEDIA_ROOT to serve the car image variants from it.
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Seed data of the Express dealer backend, also served by djangoapp.upstream_fakes.
+DEALER_DATA_DIR = BASE_DIR / 'database' / 'data'
+
+# Seconds before the in-process dealer directory is refreshed from the backend.
+DEALER_DIRECTORY_TTL = int(os.getenv('DEALER_DIRECTORY_TTL', '300'))
+
+# Dealer inventory index (djangoapp.inventory): loaded from a backend endpoint
+# returning the car records when INVENTORY_ENDPOINT is set, otherwise from
+# DEALER_DATA_DIR/car_records.json, and rebuilt every INVENTORY_TTL seconds.
+INVENTORY_ENDPOINT = os.getenv('INVENTORY_ENDPOINT', '')
+INVENTORY_TTL = int(os.getenv('INVENTORY_TTL', '300'))
+
+# Seconds before an upstream call times out; callers waiting on a coalesced
+# call give up after as long and fetch themselves.
+UPSTREAM_TIMEOUT = float(os.getenv('UPSTREAM_TIMEOUT', '10'))
+
+# Identical concurrent upstream GETs share one call (see djangoapp.restapis).
+# Coalescing across processes needs a cache shared by all workers.
+UPSTREAM_COALESCE_ACROSS_PROCESSES = \
+    os.getenv('UPSTREAM_COALESCE_ACROSS_PROCESSES', 'false').lower() == 'true'
+UPSTREAM_COALESCE_RESULT_TTL = float(os.getenv('UPSTREAM_COALESCE_RESULT_TTL', '1'))
+UPSTREAM_COALESCE_WAIT = float(os.getenv('UPSTREAM_COALESCE_WAIT', '5'))
+
+# Reviews sent to the sentiment analyzer per call by the review export.
+REVIEW_EXPORT_BATCH_SIZE = int(os.getenv('REVIEW_EXPORT_BATCH_SIZE', '100'))
+
+# Resized car image variants (see djangoapp.images). They are built by
+# `manage.py build_car_images`; CAR_IMAGE_WORKER=true also builds them in a
+# background thread whenever a car's image changes.
+CAR_IMAGE_WORKER = os.getenv('CAR_IMAGE_WORKER', 'false').lower() == 'true'
+CAR_IMAGE_TIMEOUT = float(os.getenv('CAR_IMAGE_TIMEOUT', '15'))
+CAR_IMAGE_MAX_BYTES = int(os.getenv('CAR_IMAGE_MAX_BYTES', str(25 * 1024 * 1024)))
+
+# frontend/build itself only holds index.html (a template) and the public/
+# files; listing it as well published every bundle twice under two names.
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'frontend/static'),
-    os.path.join(BASE_DIR, 'frontend/build'),
     os.path.join(BASE_DIR, 'frontend/build/static'),
 ]
+
+# collectstatic writes content-hashed copies plus .gz (and .br with the
+# optional brotli package) siblings; djangoapp.static_assets.serve sends
+# them with far-future caching. Unhashed names get STATIC_MAX_AGE seconds.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'djangoapp.static_assets.CompressedManifestStaticFilesStorage',
+    },
+}
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '300'))
+
+# Read engine of the catalogue views: 'sql' queries the database per request,
+# 'memory' serves them from a per-worker snapshot rebuilt when the catalogue
+# version changes (see djangoapp.catalogue; workers share versions through
+# CACHES, so use a shared cache with several workers).
+CATALOGUE_ENGINE = _env_choice('CATALOGUE_ENGINE', 'sql', ['sql', 'memory'])
+CATALOGUE_SNAPSHOT_MAX_AGE = int(os.getenv('CATALOGUE_SNAPSHOT_MAX_AGE', '300'))
+# Seconds between re-reads of the favourite/comment counts and trending
+# scores the snapshot leaves out (a worker's own favourites and comments
+# show up in the counts immediately).
+CATALOGUE_OVERLAY_TTL = int(os.getenv('CATALOGUE_OVERLAY_TTL', '5'))
+
+# Neighbours stored per car by `manage.py build_related_cars` (djangoapp.recommendations).
+RELATED_CARS_K = int(os.getenv('RELATED_CARS_K', '10'))
+
+# Trending cars (djangoapp.trending): half-life of an event's weight, and the
+# decayed score below which `manage.py compact_trending` clears a car's score.
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', '72'))
+TRENDING_MIN_SCORE = float(os.getenv('TRENDING_MIN_SCORE', '0.01'))
+
+# Car detail views are counted in memory and written every CAR_VIEW_FLUSH_SECONDS
+# or once CAR_VIEW_FLUSH_EVENTS are pending (djangoapp.car_views).
+CAR_VIEW_FLUSH_SECONDS = float(os.getenv('CAR_VIEW_FLUSH_SECONDS', '10'))
+CAR_VIEW_FLUSH_EVENTS = int(os.getenv('CAR_VIEW_FLUSH_EVENTS', '1000'))
+
+# Seconds the rendered front-end pages are kept in the cache (djangoapp.pages).
+STATIC_PAGE_CACHE_SECONDS = int(os.getenv('STATIC_PAGE_CACHE_SECONDS', '300'))
@@ -14,20 +14,22 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from django.views.generic import TemplateView
+from django.urls import path, include, re_path
 from django.conf.urls.static import static
 from django.conf import settings
+from djangoapp import static_assets
+from djangoapp.pages import static_page
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('djangoapp/', include('djangoapp.urls')),
-    path('', TemplateView.as_view(template_name="Home.html")),
-    path('about/', TemplateView.as_view(template_name="About.html")),
-    path('contact/', TemplateView.as_view(template_name="contact.html")),
-    path('login/', TemplateView.as_view(template_name="Login.html")),
-    path('register/', TemplateView.as_view(template_name="Register.html")),
-    path('dealers/', TemplateView.as_view(template_name="Dealers.html")),
-    path('dealer/<int:dealer_id>',TemplateView.as_view(template_name="index.html")),
-    path('postreview/<int:dealer_id>',TemplateView.as_view(template_name="index.html")),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    path('', static_page("Home.html")),
+    path('about/', static_page("About.html")),
+    path('contact/', static_page("contact.html")),
+    path('login/', static_page("Login.html")),
+    path('register/', static_page("Register.html")),
+    path('dealers/', static_page("Dealers.html")),
+    path('dealer/<int:dealer_id>',static_page("index.html")),
+    path('postreview/<int:dealer_id>',static_page("index.html")),
+    re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), static_assets.serve),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
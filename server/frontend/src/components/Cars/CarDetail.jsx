@@ -3,6 +3,7 @@ import { useParams } from "react-router-dom";
 
 import AuthContext from "../../context/AuthContext";
 import Header from "../Header/Header";
+import { carImageStyle } from "./carImage";
 import CommentThread from "./CommentThread";
 import "./CarDetail.css";
 
@@ -260,7 +261,7 @@ const CarDetail = () => {
   return (
     <div className="car-detail-page">
       <Header />
-      <div className="car-hero" style={{ backgroundImage: `url(${car.image_url})` }}>
+      <div className="car-hero" style={carImageStyle(car)}>
         <div className="container">
           <span className="badge bg-dark text-uppercase mb-3">{car.brand}</span>
           <h1 className="display-4 fw-semibold text-white">{car.name}</h1>
@@ -3,6 +3,7 @@ import { Link } from "react-router-dom";
 
 import AuthContext from "../../context/AuthContext";
 import Header from "../Header/Header";
+import { carImageStyle } from "./carImage";
 import "./CarInventory.css";
 
 const formatCurrency = (value) =>
@@ -16,12 +17,15 @@ const CarInventory = () => {
     years: [],
     price: { min: null, max: null },
   });
+  const [facets, setFacets] = useState({ brands: [], years: [], types: [], price: [] });
   const [search, setSearch] = useState("");
   const [brand, setBrand] = useState("");
+  const [carType, setCarType] = useState("");
   const [yearMin, setYearMin] = useState("");
   const [yearMax, setYearMax] = useState("");
   const [priceMin, setPriceMin] = useState("");
   const [priceMax, setPriceMax] = useState("");
+  const [sort, setSort] = useState("");
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [statusMessage, setStatusMessage] = useState("");
@@ -35,10 +39,12 @@ const CarInventory = () => {
       const params = new URLSearchParams();
       if (search.trim()) params.append("search", search.trim());
       if (brand) params.append("brand", brand);
+      if (carType) params.append("type", carType);
       if (priceMin) params.append("price_min", priceMin);
       if (priceMax) params.append("price_max", priceMax);
       if (yearMin) params.append("year_min", yearMin);
       if (yearMax) params.append("year_max", yearMax);
+      if (sort) params.append("sort", sort);
 
       try {
         const response = await fetch(`/djangoapp/api/cars/?${params.toString()}`, {
@@ -51,6 +57,7 @@ const CarInventory = () => {
         }
         setCars(data.cars);
         setAvailableFilters(data.filters);
+        setFacets(data.facets);
       } catch (err) {
         if (err.name !== "AbortError") {
           setError(err.message);
@@ -62,15 +69,17 @@ const CarInventory = () => {
 
     fetchCars();
     return () => controller.abort();
-  }, [search, brand, priceMin, priceMax, yearMin, yearMax]);
+  }, [search, brand, carType, priceMin, priceMax, yearMin, yearMax, sort]);
 
   const handleReset = () => {
     setSearch("");
     setBrand("");
+    setCarType("");
     setYearMin("");
     setYearMax("");
     setPriceMin("");
     setPriceMax("");
+    setSort("");
   };
 
   const handleFavorite = async (carId) => {
@@ -134,9 +143,24 @@ const CarInventory = () => {
                   onChange={(event) => setBrand(event.target.value)}
                 >
                   <option value="">Todas as marcas</option>
-                  {availableFilters.brands.map((item) => (
-                    <option key={item} value={item}>
-                      {item}
+                  {facets.brands.map((item) => (
+                    <option key={item.value} value={item.value} disabled={item.count === 0 && item.value !== brand}>
+                      {item.value} ({item.count})
+                    </option>
+                  ))}
+                </select>
+              </div>
+              <div className="mb-3">
+                <label className="form-label">Tipo</label>
+                <select
+                  className="form-select"
+                  value={carType}
+                  onChange={(event) => setCarType(event.target.value)}
+                >
+                  <option value="">Todos os tipos</option>
+                  {facets.types.map((item) => (
+                    <option key={item.value} value={item.value} disabled={item.count === 0 && item.value !== carType}>
+                      {item.label} ({item.count})
                     </option>
                   ))}
                 </select>
@@ -197,6 +221,13 @@ const CarInventory = () => {
                   </select>
                 </div>
               </div>
+              <div className="mb-3">
+                <label className="form-label">Ordenar por</label>
+                <select className="form-select" value={sort} onChange={(event) => setSort(event.target.value)}>
+                  <option value="">Marca e modelo</option>
+                  <option value="trending">Em alta</option>
+                </select>
+              </div>
               <button className="btn btn-outline-secondary w-100" onClick={handleReset}>
                 Limpar filtros
               </button>
@@ -230,7 +261,7 @@ const CarInventory = () => {
                 {cars.map((car) => (
                   <div className="col-md-6 col-xl-4" key={car.id}>
                     <div className="car-card h-100 d-flex flex-column">
-                      <div className="car-card-image" style={{ backgroundImage: `url(${car.image_url})` }} />
+                      <div className="car-card-image" style={carImageStyle(car)} />
                       <div className="car-card-body flex-grow-1 d-flex flex-column">
                         <div className="d-flex justify-content-between align-items-start mb-2">
                           <span className="badge bg-dark text-uppercase">{car.brand}</span>
@@ -0,0 +1,27 @@
+// Background image for a car card or hero: the resized variants (1x/2x)
+// when the server has built them, otherwise the original image URL.
+
+const supports = (value) =>
+  typeof CSS !== "undefined" && typeof CSS.supports === "function" && CSS.supports("background-image", value);
+
+// Unprefixed image-set() shipped after WebP support in every engine, while
+// older Safari only knows -webkit-image-set() and may not decode WebP.
+const imageSet = supports('image-set(url("x.png") 1x)')
+  ? "image-set"
+  : supports('-webkit-image-set(url("x.png") 1x)')
+    ? "-webkit-image-set"
+    : null;
+
+export const carImageStyle = (car) => {
+  const image = car.image;
+  if (!image) {
+    return { backgroundImage: `url(${car.image_url})` };
+  }
+  if (imageSet === "image-set") {
+    return { backgroundImage: `image-set(url(${image.webp}) 1x, url(${image.webp_2x}) 2x)` };
+  }
+  if (imageSet === "-webkit-image-set") {
+    return { backgroundImage: `-webkit-image-set(url(${image.jpeg}) 1x, url(${image.jpeg_2x}) 2x)` };
+  }
+  return { backgroundImage: `url(${image.jpeg})` };
+};